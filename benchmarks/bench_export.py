@@ -0,0 +1,35 @@
+# Export benchmark: python benchmarks/bench_export.py [--messages N ...] [--actors N ...]
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+import pyplot
+from synthetic import generate_plot
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures Plot.export time as messages and actors grow.')
+    parser.add_argument('--messages', type=int, nargs='+', default=[10000, 20000, 40000])
+    parser.add_argument('--actors', type=int, nargs='+', default=[4, 8, 16])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'messages':>9} {'actors':>7} {'seconds':>9} {'us/message':>11} {'ns/(message*actor)':>19}")
+    for nb_actors in args.actors:
+        for nb_messages in args.messages:
+            plot = pyplot.Plot('bench', io.StringIO(generate_plot(nb_messages, nb_actors)))
+            plot.parse()
+            best = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                plot.export(io.StringIO())
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            print(f"{nb_messages:>9} {nb_actors:>7} {best:>9.3f} {best / nb_messages * 1e6:>11.2f} {best / nb_messages / nb_actors * 1e9:>19.1f}")
+
+if __name__ == '__main__':
+    main()
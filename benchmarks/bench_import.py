@@ -0,0 +1,81 @@
+# Startup benchmark: python benchmarks/bench_import.py [--budget MS] [--runs N]
+#
+# Measures, in fresh processes, `import pyplot` followed by parsing and exporting a plot, and checks it against a budget.
+# The heavy optional dependencies (jinja2, asyncio, the process pool, sockets, hashing) must not be imported by parsing or exporting.
+# Exits with 1 when the budget is exceeded or when one of them was imported.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Modules that only templates, asynchronous plays, process pools, replays or the plot cache need.
+HEAVY_MODULES = ('jinja2', 'asyncio', 'concurrent.futures.process', 'multiprocessing', 'socket', 'hashlib', 'pickle')
+
+CHILD = '''
+import sys, time, json
+started = time.perf_counter()
+import pyplot
+imported = time.perf_counter()
+plot = pyplot.Plot("startup", sys.argv[1])
+plot.parse()
+plot.export()
+done = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "parse_ms": (done - imported) * 1000,
+    "heavy_modules": [name for name in sys.argv[2:] if name in sys.modules],
+}))
+'''
+
+def measure(runs: int, plot_path: str) -> dict:
+    """
+    Runs the startup measure in fresh processes, with the bytecode of the package cached as in a normal installation.
+
+    Args:
+        runs (int): The number of measured processes.
+        plot_path (str): The plot parsed after the import.
+
+    Returns:
+        dict: The median import and parse times in milliseconds, and the heavy modules that were imported.
+    """
+    with tempfile.TemporaryDirectory() as pycache:
+        env = dict(os.environ, PYTHONPATH=ROOT, PYTHONPYCACHEPREFIX=pycache)
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+        command = [sys.executable, '-c', CHILD, plot_path, *HEAVY_MODULES]
+        # The first run writes the bytecode.
+        subprocess.run(command, env=env, check=True, capture_output=True)
+        samples = [json.loads(subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout)
+                   for _ in range(runs)]
+    return {
+        'import_ms': statistics.median(sample['import_ms'] for sample in samples),
+        'parse_ms': statistics.median(sample['parse_ms'] for sample in samples),
+        'heavy_modules': sorted({name for sample in samples for name in sample['heavy_modules']}),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures the startup time of pyplot against a budget.')
+    parser.add_argument('--budget', type=float, default=60.0, help='maximum median time of import and parse, in milliseconds')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--plot', default=os.path.join(ROOT, 'scenarios', 'scenario.plot'))
+    args = parser.parse_args()
+
+    result = measure(args.runs, os.path.abspath(args.plot))
+    total = result['import_ms'] + result['parse_ms']
+    print(f"import {result['import_ms']:.1f} ms, parse and export {result['parse_ms']:.1f} ms, total {total:.1f} ms (budget {args.budget:.0f} ms)")
+    failed = False
+    if total > args.budget:
+        print('over budget')
+        failed = True
+    if result['heavy_modules']:
+        print(f"imported by parsing or exporting: {', '.join(result['heavy_modules'])}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
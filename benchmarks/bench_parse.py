@@ -0,0 +1,34 @@
+# Parse throughput benchmark: python benchmarks/bench_parse.py [--messages N] [--actors N]
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+import pyplot
+from synthetic import generate_plot
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures PlotParser.parse throughput.')
+    parser.add_argument('--messages', type=int, default=50000)
+    parser.add_argument('--actors', type=int, default=6)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    text = generate_plot(args.messages, args.actors)
+    nb_lines = text.count('\n')
+    best = None
+    for _ in range(args.repeat):
+        plot = pyplot.Plot('bench', io.StringIO(text))
+        start = time.perf_counter()
+        plot.parse()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{args.messages} messages, {nb_lines} lines, {len(text) / 1e6:.1f} MB")
+    print(f"best of {args.repeat}: {best:.3f}s, {nb_lines / best:,.0f} lines/s, {len(text) / 1e6 / best:.1f} MB/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+# Benchmark suite: python benchmarks/run.py [--quick] [--output results.json]
+#
+# Times PlotParser.parse in each parse mode, play() with growing numbers of registered actions and templates,
+# and Plot.export, on synthetic plots, and the startup time of a process parsing a plot. Results are written as JSON, to compare runs across versions.
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+import pyplot
+from synthetic import generate_plot
+import bench_import
+
+def best_time(function, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def result(benchmark: str, params: dict, seconds: float, messages: int) -> dict:
+    return {'benchmark': benchmark, 'params': params, 'seconds': seconds, 'us_per_message': seconds / messages * 1e6}
+
+def bench_parse(sizes: list[dict], repeat: int, directory: str) -> list[dict]:
+    results = []
+    for size in sizes:
+        path = os.path.join(directory, 'parse.plot')
+        with open(path, 'w') as file:
+            file.write(generate_plot(**size))
+        for mode in ({}, {'lazy': True}, {'use_mmap': True}):
+            seconds = best_time(lambda: pyplot.Plot('bench', path, **mode).parse(), repeat)
+            results.append(result('parse', dict(size, mode=','.join(mode) or 'default'), seconds, size['messages']))
+    return results
+
+def bench_play(size: dict, action_counts: list[int], repeat: int, directory: str) -> list[dict]:
+    # Actions are registered globally, so they are added as the counts grow.
+    # Half are template actions on titles, matching the plot titles first, half are generic triggers.
+    pyplot.configure_templates(search_path=directory)
+    plot = pyplot.Plot('bench', io.StringIO(generate_plot(**size)))
+    plot.parse()
+    registered = 0
+    results = []
+    for count in sorted(action_counts):
+        while registered < count:
+            index = registered // 2
+            if registered % 2 == 0:
+                name = f"template{index}.templ"
+                with open(os.path.join(directory, name), 'w') as file:
+                    file.write("{{ message.title }} {{ message.sender.name }} -> {{ message.receiver.name }}")
+                pyplot.template_action(type(f"TemplateAction{index}", (), {'message': f"TITLE{index}", 'template': name}))
+            else:
+                modulo = index + 2
+                pyplot.action(type(f"GenericAction{index}", (), {
+                    'trigger': staticmethod(lambda plot, message, modulo=modulo: message.order % modulo == 0),
+                    'execute': staticmethod(lambda plot, message: None),
+                }))
+            registered += 1
+        for batch_size in (None, 1024):
+            seconds = best_time(lambda: pyplot.play(plot, batch_size=batch_size), repeat)
+            results.append(result('play', dict(size, actions=count, batch_size=batch_size), seconds, size['messages']))
+    return results
+
+def bench_export(sizes: list[dict], repeat: int) -> list[dict]:
+    results = []
+    for size in sizes:
+        plot = pyplot.Plot('bench', io.StringIO(generate_plot(**size)))
+        plot.parse()
+        seconds = best_time(lambda: plot.export(io.StringIO()), repeat)
+        results.append(result('export', size, seconds, size['messages']))
+    return results
+
+def environment() -> dict:
+    try:
+        revision = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        revision = ''
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'revision': revision}
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs the pyplot benchmark suite.')
+    parser.add_argument('--quick', action='store_true', help='smaller plots, for a smoke run')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=None, help='file where the JSON results are written (default: standard output)')
+    args = parser.parse_args()
+
+    scale = 1 if args.quick else 10
+    parse_sizes = [
+        {'messages': 2000 * scale, 'actors': 4},
+        {'messages': 2000 * scale, 'actors': 16},
+        {'messages': 2000 * scale, 'actors': 4, 'payload_keys': 8, 'depth': 3},
+        {'messages': 2000 * scale, 'actors': 4, 'continuation': 0.0},
+        {'messages': 2000 * scale, 'actors': 4, 'continuation': 1.0},
+        {'messages': 2000 * scale, 'actors': 4, 'payload_keys': 0},
+    ]
+    export_sizes = [
+        {'messages': 2000 * scale, 'actors': 4},
+        {'messages': 4000 * scale, 'actors': 4},
+        {'messages': 2000 * scale, 'actors': 16},
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        results = bench_parse(parse_sizes, args.repeat, directory)
+        results += bench_export(export_sizes, args.repeat)
+        results += bench_play({'messages': 1000 * scale, 'actors': 4, 'titles': 50}, [0, 2, 20, 200], args.repeat, directory)
+    startup = bench_import.measure(args.repeat * 3, os.path.join(bench_import.ROOT, 'scenarios', 'scenario.plot'))
+    results.append({'benchmark': 'startup', 'params': {}, **startup})
+
+    report = json.dumps({'environment': environment(), 'results': results}, indent=2)
+    if args.output is None:
+        print(report)
+    else:
+        with open(args.output, 'w') as file:
+            file.write(report + '\n')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# Synthetic plot generator for the benchmarks.
+
+import json
+import random
+
+def payload(keys: int, depth: int, rng: random.Random) -> dict:
+    """
+    Builds a JSON payload with `keys` keys per object, nested `depth` times.
+    """
+    data = {}
+    for index in range(keys):
+        if depth > 1 and index == 0:
+            data[f"nested{index}"] = payload(keys, depth - 1, rng)
+        else:
+            data[f"key{index}"] = rng.choice([rng.randint(0, 10 ** 6), f"value-{rng.random():.6f}", [1, 2, 3], None, True])
+    return data
+
+def generate_plot(messages: int, actors: int, payload_keys: int = 2, depth: int = 1, continuation: float = 0.33,
+                  titles: int = 10, seed: int = 0) -> str:
+    """
+    Generates a plot where every actor talks to the next one.
+
+    Args:
+        messages (int): The number of messages.
+        actors (int): The number of actors, at least 2.
+        payload_keys (int, optional): The number of keys of each JSON object. 0 for messages without JSON data. Defaults to 2.
+        depth (int, optional): The nesting depth of the payloads. Defaults to 1.
+        continuation (float, optional): The fraction of messages written over several lines, with a comment. Defaults to 0.33.
+        titles (int, optional): The number of distinct message titles, TITLE0 to TITLE<n-1>. Defaults to 10.
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        str: The plot.
+    """
+    rng = random.Random(seed)
+    width = 10
+    names = [f"Actor{index}" for index in range(actors)]
+    empty = ('|' + ' ' * width) * (actors - 1) + '|'
+    lines = [(' ' * 4).join(names), empty]
+    for order in range(messages):
+        left = order % (actors - 1)
+        right = order % 2
+        row = ''
+        for column in range(actors - 1):
+            if column == left:
+                row += '|' + '-' * (width - 1) + '>' if right else '|<' + '-' * (width - 1)
+            else:
+                row += '|' + ' ' * width
+        row += '|'
+        title = f"TITLE{order % titles}"
+        if payload_keys == 0:
+            lines.append(row + f" {title} plain text content {order}")
+        elif rng.random() < continuation:
+            text = json.dumps(payload(payload_keys, depth, rng), indent=2).split('\n')
+            lines.append(row + f" {title} {text[0]}")
+            lines.extend(empty + ' ' + line for line in text[1:])
+            lines.append(empty + ' # comment')
+        else:
+            lines.append(row + f" {title} {json.dumps(payload(payload_keys, depth, rng))}")
+        lines.append(empty)
+    return '\n'.join(lines) + '\n'
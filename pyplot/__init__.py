@@ -1,3 +1,37 @@
 from .pyplot import *
 from .action import *
-from .decorators import *
\ No newline at end of file
+from .matching import *
+from .templates import *
+from .decorators import *
+from .profiling import *
+
+import importlib as _importlib
+
+# The optional subsystems are imported when one of their names is first accessed,
+# so `import pyplot` only loads what parsing, exporting and playing need.
+_LAZY_MODULES = {
+    'cache': ('CACHE_FORMAT_VERSION', 'PlotCache'),
+    'batch': ('PlayResult', 'find_plots', 'play_file', 'init_worker', 'play_many'),
+    'incremental': ('IncrementalPlot', 'same_message', 'changed_range', 'watch'),
+    'async_play': ('ordering_keys', 'run_message', 'play_async_stream', 'play_async'),
+    'replaying': ('ReplayStep', 'replay_steps', 'actor_address', 'recv_exactly', 'ResponseReader', 'Framing', 'frame_by_length', 'frame_by_delimiter',
+                  'frame_until_idle', 'frame_http', 'ConnectionPool', 'ReplayReport', 'replay_once', 'replay', 'StandInServer', 'stand_in_servers'),
+    'scenario': ('MessageView', 'BoundPlot', 'Scenario'),
+    'validate': ('Diagnostic', 'ValidationResult', 'PlotValidator', 'validate_file', 'validate_many', 'validation_report'),
+}
+_LAZY_NAMES = {name: module for module, names in _LAZY_MODULES.items() for name in names}
+
+__all__ = [name for name in globals() if not name.startswith('_')] + list(_LAZY_NAMES)
+
+def __getattr__(name: str):
+    module = _LAZY_NAMES.get(name, name)
+    if module not in _LAZY_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    imported = _importlib.import_module(f'.{module}', __name__)
+    # All the names of the module are bound at once, so it is imported and looked up only once.
+    for lazy_name in _LAZY_MODULES[module]:
+        globals()[lazy_name] = getattr(imported, lazy_name)
+    return globals()[name]
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_MODULES) | set(_LAZY_NAMES))
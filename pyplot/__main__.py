@@ -0,0 +1,147 @@
+# Command line entry point: python -m pyplot
+
+import argparse
+import importlib
+import json
+import os
+import sys
+from .pyplot import Plot, PlotError
+from .templates import configure_templates
+
+# The modules of each command are imported by its handler, so a command does not load what the others need.
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='pyplot', description='Play plot files.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    play_parser = commands.add_parser('play', help='parse and play plot files, printing the results')
+    play_parser.add_argument('paths', nargs='+', help='plot files, or directories searched for .plot files')
+    play_parser.add_argument('-w', '--workers', type=int, default=None, help='number of processes (default: number of CPUs)')
+    play_parser.add_argument('-m', '--module', dest='modules', action='append', default=[], help='module registering actions, may be repeated')
+    play_parser.add_argument('--unordered', action='store_true', help='print results as soon as they are ready')
+    play_parser.add_argument('--templates', default='./', help='directory the templates are loaded from')
+    play_parser.add_argument('--bytecode-cache', default=None, help='directory where compiled templates are stored')
+    play_parser.add_argument('--plot-cache', default=None, help='directory where parsed plots are stored')
+    play_parser.add_argument('--batch-size', type=int, default=None, help='render the messages of a same template by batches of this many messages')
+
+    watch_parser = commands.add_parser('watch', help='play a plot file again, incrementally, whenever it is saved')
+    watch_parser.add_argument('path', help='plot file')
+    watch_parser.add_argument('-m', '--module', dest='modules', action='append', default=[], help='module registering actions, may be repeated')
+    watch_parser.add_argument('-o', '--output', default=None, help='file where the result is written (default: standard output)')
+    watch_parser.add_argument('--interval', type=float, default=0.2, help='seconds between two checks of the file')
+    watch_parser.add_argument('--templates', default='./', help='directory the templates are loaded from')
+    watch_parser.add_argument('--bytecode-cache', default=None, help='directory where compiled templates are stored')
+
+    replay_parser = commands.add_parser('replay', help='send the rendered messages of an actor over TCP and check the responses')
+    replay_parser.add_argument('path', help='plot file')
+    replay_parser.add_argument('--actor', required=True, help='the actor whose messages are sent')
+    replay_parser.add_argument('-a', '--address', dest='addresses', action='append', default=[], metavar='ACTOR=HOST:PORT',
+                               help='address of another actor, may be repeated')
+    replay_parser.add_argument('-m', '--module', dest='modules', action='append', default=[], help='module registering actions, may be repeated')
+    replay_parser.add_argument('-n', '--iterations', type=int, default=1, help='number of times the plot is replayed')
+    replay_parser.add_argument('-c', '--concurrency', type=int, default=1, help='number of replays running at once')
+    replay_parser.add_argument('--timeout', type=float, default=5.0, help='timeout of the connections, in seconds')
+    replay_parser.add_argument('--framing', choices=('idle', 'http', 'line', 'length'), default='idle',
+                               help='how responses are delimited: by a pause (default), as HTTP responses, by a newline, or by the length of the rendered message')
+    replay_parser.add_argument('--idle', type=float, default=0.05, help='pause ending a response with --framing idle, in seconds')
+    replay_parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    replay_parser.add_argument('--templates', default='./', help='directory the templates are loaded from')
+    replay_parser.add_argument('--bytecode-cache', default=None, help='directory where compiled templates are stored')
+
+    validate_parser = commands.add_parser('validate', help='check plot files without playing them, reporting every error')
+    validate_parser.add_argument('paths', nargs='+', help='plot files, or directories searched for .plot files')
+    validate_parser.add_argument('-w', '--workers', type=int, default=None, help='number of processes (default: number of CPUs)')
+    validate_parser.add_argument('--max-errors', type=int, default=None, help='stop checking a file after this many errors')
+    validate_parser.add_argument('--json', action='store_true', help='print the report as JSON')
+
+    args = parser.parse_args(argv)
+    if args.command == 'validate':
+        return validate_plots(args)
+    sys.path.insert(0, os.getcwd())
+    configure_templates(args.templates, bytecode_cache_dir=args.bytecode_cache)
+    for module in args.modules:
+        importlib.import_module(module)
+
+    if args.command == 'watch':
+        return watch_plot(args)
+    if args.command == 'replay':
+        return replay_plot(args)
+    return play_plots(args)
+
+def play_plots(args) -> int:
+    from .batch import play_many
+    cache = None
+    if args.plot_cache:
+        from .cache import PlotCache
+        cache = PlotCache(args.plot_cache)
+    failed = 0
+    for result in play_many(args.paths, workers=args.workers, ordered=not args.unordered, modules=args.modules, cache=cache,
+                            batch_size=args.batch_size):
+        if result.ok:
+            sys.stdout.write(result.output)
+        else:
+            failed += 1
+            print(f"Error playing {result.path}:\n{result.error}", file=sys.stderr)
+    return 1 if failed else 0
+
+def watch_plot(args) -> int:
+    from .incremental import watch
+
+    def on_change(incremental, changed):
+        result = incremental.result()
+        if args.output is None:
+            sys.stdout.write(result)
+            sys.stdout.flush()
+        else:
+            with open(args.output, 'w') as file:
+                file.write(result)
+        print(f"{len(changed)} message(s) played again in {incremental.duration * 1000:.1f} ms", file=sys.stderr)
+
+    watch(args.path, on_change, interval=args.interval)
+    return 0
+
+def validate_plots(args) -> int:
+    from .validate import validate_many, validation_report
+    results = validate_many(args.paths, workers=args.workers, max_errors=args.max_errors)
+    if args.json:
+        report = validation_report(results)
+        print(json.dumps(report, indent=2))
+        return 1 if report['invalid'] else 0
+    invalid = 0
+    for result in results:
+        if not result.ok:
+            invalid += 1
+            for line in result.lines():
+                print(line)
+    return 1 if invalid else 0
+
+def replay_plot(args) -> int:
+    from .replaying import frame_by_delimiter, frame_by_length, frame_http, frame_until_idle, replay
+    plot = Plot(args.path, args.path)
+    try:
+        plot.parse()
+    except PlotError:
+        return 1
+    for address in args.addresses:
+        name, _, value = address.partition('=')
+        if plot.get_actor(name) is None:
+            print(f"Unknown actor {name}", file=sys.stderr)
+            return 1
+        host, _, port = value.rpartition(':')
+        plot.set_actor_data(dict(plot.get_actor(name).data or {}, host=host, port=int(port)), name)
+    framing = {
+        'idle': lambda: frame_until_idle(args.idle),
+        'http': lambda: frame_http,
+        'line': lambda: frame_by_delimiter(b'\n'),
+        'length': lambda: frame_by_length,
+    }[args.framing]()
+    try:
+        report = replay(plot, args.actor, iterations=args.iterations, concurrency=args.concurrency, timeout=args.timeout, framing=framing)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(json.dumps(report.report(), indent=2) if args.json else report.summary())
+    return 1 if report.mismatches or report.errors else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
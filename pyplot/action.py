@@ -1,5 +1,10 @@
-import jinja2
+from typing import Callable, Iterable, Iterator, TextIO
+import threading
+import time
 from .pyplot import Message, Plot
+from .matching import Match, MatchIndex, message_direction
+from .templates import template_cache, render_many
+from .profiling import Profiler
 
 class ActionOverloadError(Exception):
     """
@@ -17,10 +22,25 @@ class ActionOverloadError(Exception):
     def __str__(self):
         return f"Action {self.obj.__name__}.{self.function} was not implemented."
 
-__plot_actions = {}
+class RegistryFrozenError(Exception):
+    """
+    Exception raised when an action is registered in a frozen registry.
+
+    Attributes:
+        registry (ActionRegistry): The frozen registry.
+        obj (type): The action that was not registered.
+    """
+
+    def __init__(self, registry, obj):
+        self.registry = registry
+        self.obj = obj
+
+    def __str__(self):
+        return f"Action {self.obj.__name__} cannot be registered, the registry {self.registry.name} is frozen."
+
 def action(classDefinition):
     """
-    Decorator to register a class action and check if it was overloaded.
+    Decorator to register a class action in the default registry and check if it was overloaded.
 
     Args:
         classDefinition: The class to be registered as an action.
@@ -31,19 +51,205 @@ def action(classDefinition):
     Returns:
         The registered class.
     """
-    def check_method(name):
-        if not hasattr(classDefinition, name):
-            raise ActionOverloadError(classDefinition, name)
-    check_method('trigger')
-    check_method('execute')
+    return default_registry.action(classDefinition)
+
+def title_trigger(message_title: str, upper: bool = False) -> Match:
+    """
+    Creates a trigger matching messages by title.
+    The trigger is a `Match`, so that `play` can index the action by title instead of calling the trigger.
+
+    Args:
+        message_title (str): The title to match.
+        upper (bool, optional): If True, the message title is upper-cased before comparing it. Defaults to False.
+
+    Returns:
+        Match: The trigger.
+    """
+    return Match(title=message_title, upper=upper)
+
+
+class Dispatcher:
+    """
+    Finds the actions to run for a message.
+    Actions whose trigger is a `Match` are compiled into a `MatchIndex`, other actions are evaluated on every message.
+    The actions for a message are resolved once per title, or per title, actors and direction when a matcher uses them,
+    and cached, keeping the registration order.
+    The templates of the template actions are loaded when the dispatcher is created, and bound to their actions.
+    A dispatcher is not modified after that, apart from its cache, and can be shared between threads.
+
+    Attributes:
+        actions (list): The registered actions, in registration order.
+        index (MatchIndex): The compiled matchers.
+        generic (list[int]): Positions of the actions whose trigger must be called.
+        fields (tuple[str, ...]): The message fields other than the title used by the matchers.
+        templates (dict[str, jinja2.Template]): The templates of the template actions, by name.
+        template_mtimes (dict[str, int]): The mtime of the file of each template, taken before it was loaded.
+        template_generation (int): The generation of the template cache the templates were loaded from.
+        template_names (dict[type, str]): The template name of each template action.
+        executes (list[Callable]): The execute function of each action, bound to its template for template actions.
+        cache (dict): The resolved actions, by message key.
+    """
+
+    def __init__(self, actions: Iterable[type]):
+        self.actions = list(actions)
+        self.index = MatchIndex()
+        self.generic = []
+        self.templates = {}
+        self.template_mtimes = {}
+        self.template_generation = template_cache.generation
+        self.template_names = {}
+        self.executes = []
+        self.cache = {}
+        for position, action in enumerate(self.actions):
+            template_name = getattr(action.execute, 'template', None)
+            if template_name is None:
+                self.executes.append(action.execute)
+            else:
+                if template_name not in self.templates:
+                    self.template_mtimes[template_name] = template_cache.get_mtime(template_name)
+                    self.templates[template_name] = template_cache.get_template(template_name)
+                self.template_names[action] = template_name
+                self.executes.append(template_execute(self.templates[template_name]))
+            if isinstance(action.trigger, Match):
+                self.index.add(position, action.trigger)
+            else:
+                self.generic.append(position)
+        self.fields = self.index.message_fields()
+
+    def templates_changed(self) -> bool:
+        """
+        Checks whether the templates were loaded before the template cache was configured again, or before their file changed.
+
+        Returns:
+            bool: True if a template must be loaded again.
+        """
+        if self.template_generation != template_cache.generation:
+            return True
+        return any(template_cache.get_mtime(name) != mtime for name, mtime in self.template_mtimes.items())
+
+    def lookup(self, message: Message) -> list[tuple[type, Callable | None, Callable]]:
+        """
+        Gets the candidate actions for a message.
+
+        Args:
+            message (Message): The message.
+
+        Returns:
+            list[tuple[type, Callable | None, Callable]]: The actions, in registration order, with the check still to call on the message,
+                the trigger or the data pattern of the matcher, or None, and the execute function.
+        """
+        if self.fields:
+            key = (message.title, message.sender.name, message.receiver.name, message_direction(message))
+        else:
+            key = message.title
+        candidates = self.cache.get(key)
+        if candidates is None:
+            if self.fields:
+                matched = self.index.resolve(*key)
+            else:
+                matched = self.index.resolve(key)
+            candidates = []
+            for position in sorted(matched.union(self.generic)):
+                action = self.actions[position]
+                if position in matched:
+                    check = action.trigger.match_data if action.trigger.data is not None else None
+                else:
+                    check = action.trigger
+                candidates.append((action, check, self.executes[position]))
+            self.cache[key] = candidates
+        return candidates
+
+    def run(self, plot: Plot, message: Message) -> Iterator[str]:
+        """
+        Executes the actions triggered by a message.
+
+        Args:
+            plot (Plot): The plot of the message.
+            message (Message): The message.
+
+        Returns:
+            Iterator[str]: The outputs of the executed actions, in order.
+        """
+        for action, check, execute in self.lookup(message):
+            if check is not None and not check(plot, message):
+                continue
+            res = execute(plot, message)
+            if type(res) is str:
+                yield res
+
+    def run_profiled(self, plot: Plot, message: Message, profiler: Profiler) -> Iterator[str]:
+        """
+        Executes the actions triggered by a message, like `run`, recording their timings in a profiler.
+
+        Args:
+            plot (Plot): The plot of the message.
+            message (Message): The message.
+            profiler (Profiler): The profiler recording the timings.
+
+        Returns:
+            Iterator[str]: The outputs of the executed actions, in order.
+        """
+        for action, check, execute in self.lookup(message):
+            if check is not None:
+                started = time.perf_counter()
+                triggered = check(plot, message)
+                profiler.record_trigger(action, bool(triggered), time.perf_counter() - started)
+                if not triggered:
+                    continue
+            else:
+                profiler.record_trigger(action, True, 0.0)
+            started = time.perf_counter()
+            res = execute(plot, message)
+            duration = time.perf_counter() - started
+            profiler.record_execute(action, duration)
+            template_name = self.template_names.get(action)
+            if template_name is not None:
+                profiler.record_template(template_name, duration)
+            if type(res) is str:
+                yield res
+
+
+def template_execute(template) -> Callable:
+    """
+    Creates the execute function of a template action, rendering the message with a template.
+
+    Args:
+        template (jinja2.Template): The template.
+
+    Returns:
+        Callable: The execute function.
+    """
+    def __run_template(plot, message):
+        return template.render(message=message) + '\n'
+    return __run_template
+
+def prepare_template_action(classDefinition):
+    """
+    Sets the trigger and execute of a template action, from its "message" and "template" attributes.
+    The execute function loads the template from the template cache, dispatchers bind it to their own template instead.
+
+    Args:
+        classDefinition: The class definition containing the action details.
+
+    Returns:
+        The class definition.
+    """
+    if not hasattr(classDefinition, 'trigger'):
+        if hasattr(classDefinition, 'message'):
+            setattr(classDefinition, 'trigger', title_trigger(classDefinition.message))
 
-    __plot_actions[classDefinition.__name__] = classDefinition
+    if not hasattr(classDefinition, 'execute'):
+        if hasattr(classDefinition, 'template'):
+            template_name = classDefinition.template
+            def __run_template(plot, message):
+                return template_cache.get_template(template_name).render(message=message) + '\n'
+            __run_template.template = template_name
+            setattr(classDefinition, 'execute', __run_template)
     return classDefinition
 
-__templates = {}
 def template_action(classDefinition):
     """
-    Applies a template-based action to a plot.
+    Applies a template-based action to a plot, registering it in the default registry.
     It looks for a "template" attribute in the class definition and uses it to render the message.
     It also looks for a "message" attribute in the class definition and uses it to match the message title.
 
@@ -56,45 +262,299 @@ def template_action(classDefinition):
     Raises:
         None.
     """
+    return default_registry.template_action(classDefinition)
 
-    if not hasattr(classDefinition, 'trigger'):
-        if hasattr(classDefinition, 'message'):
-            message_title = classDefinition.message
-            def __match_title(plot, message):
-                return message_title == message.title
-            setattr(classDefinition, 'trigger', __match_title)
 
-    if not hasattr(classDefinition, 'execute'):
-        if hasattr(classDefinition, 'template'):
-            template_name = classDefinition.template
-            if template_name not in __templates:
-                __templates[template_name] = None
-            def __run_template(plot, message):
-                template = __templates[template_name]
-                return template.render(message=message) + '\n'
-            setattr(classDefinition, 'execute', __run_template)
-    return action(classDefinition)
+class Player:
+    """
+    Plays plots with a fixed set of actions, indexed and with their templates loaded once.
+    A player is not modified by playing, so it can be shared between threads, each play using its own profiler.
 
+    Attributes:
+        dispatcher (Dispatcher): The dispatcher of the actions.
 
-def play(plot: Plot):
+    Methods:
+        play_stream(self, plot, profiler, batch_size) -> Iterator[str]: Plays a plot, yielding each action output.
+        play(self, plot, writer, profiler, batch_size) -> str | None: Plays a plot.
+    """
+
+    def __init__(self, actions: Iterable[type]):
+        self.dispatcher = Dispatcher(actions)
+
+    def play_stream(self, plot: Plot, profiler: Profiler = None, batch_size: int = None) -> Iterator[str]:
+        """
+        Executes the actions for each message, yielding each action output as soon as it is produced. See `play_stream`.
+        """
+        return run_plot(plot, self.dispatcher, profiler, batch_size)
+
+    def play(self, plot: Plot, writer: TextIO = None, profiler: Profiler = None, batch_size: int = None) -> str | None:
+        """
+        Executes the actions for each message. See `play`.
+        """
+        return write_outputs(self.play_stream(plot, profiler, batch_size), writer)
+
+
+class ActionRegistry:
+    """
+    A set of actions, played together.
+    The module-level `action` and `template_action` decorators register into `default_registry`, which `play` uses.
+    Separate registries let unrelated suites of plots be played without running each other's actions.
+
+    Attributes:
+        name (str): The name of the registry.
+        actions (dict[str, type]): The registered actions, by class name, in registration order.
+        frozen (bool): If True, no action can be registered anymore.
+        version (int): Incremented whenever an action is registered.
+
+    Methods:
+        action(self, classDefinition): Decorator registering an action.
+        template_action(self, classDefinition): Decorator registering a template action.
+        freeze(self) -> Player: Forbids new registrations and gets the player of the actions.
+        player(self) -> Player: Gets a player of the registered actions.
+    """
+
+    def __init__(self, name: str = 'default'):
+        self.name = name
+        self.actions = {}
+        self.frozen = False
+        self.frozen_player = None
+        self.version = 0
+        self.cached_player = None
+        self.cached_version = None
+        self.lock = threading.Lock()
+
+    def action(self, classDefinition):
+        """
+        Decorator to register a class action and check if it was overloaded.
+
+        Args:
+            classDefinition: The class to be registered as an action.
+
+        Raise:
+            ActionOverloadError: If the class does not have the required methods 'trigger' and 'execute'.
+            RegistryFrozenError: If the registry is frozen.
+
+        Returns:
+            The registered class.
+        """
+        def check_method(name):
+            if not hasattr(classDefinition, name):
+                raise ActionOverloadError(classDefinition, name)
+        check_method('trigger')
+        check_method('execute')
+
+        with self.lock:
+            if self.frozen:
+                raise RegistryFrozenError(self, classDefinition)
+            self.actions[classDefinition.__name__] = classDefinition
+            self.version += 1
+        return classDefinition
+
+    def template_action(self, classDefinition):
+        """
+        Decorator to register a template action, see `template_action`.
+        """
+        return self.action(prepare_template_action(classDefinition))
+
+    def freeze(self) -> Player:
+        """
+        Forbids new registrations, and compiles the player of the actions once.
+
+        Returns:
+            Player: The player of the actions, the same on every call.
+        """
+        with self.lock:
+            self.frozen = True
+            if self.frozen_player is None:
+                self.frozen_player = Player(self.actions.values())
+            return self.frozen_player
+
+    def player(self) -> Player:
+        """
+        Gets a player of the registered actions. A frozen registry always returns the same player.
+        Otherwise the player is kept until an action is registered or a template changes, and then compiled again.
+
+        Returns:
+            Player: The player.
+        """
+        with self.lock:
+            if self.frozen_player is not None:
+                return self.frozen_player
+            version = self.version
+            player = self.cached_player if self.cached_version == version else None
+            actions = list(self.actions.values())
+        if player is not None and not player.dispatcher.templates_changed():
+            return player
+        player = Player(actions)
+        with self.lock:
+            if self.version == version:
+                self.cached_player, self.cached_version = player, version
+        return player
+
+default_registry = ActionRegistry()
+
+
+def prepare_play(registry: ActionRegistry = None) -> Dispatcher:
+    """
+    Loads the templates of the template actions and indexes the registered actions.
+
+    Args:
+        registry (ActionRegistry, optional): The registry of the actions. Defaults to `default_registry`.
+
+    Returns:
+        Dispatcher: The dispatcher of the registered actions.
+    """
+    return (registry or default_registry).player().dispatcher
+
+
+def play_batches(plot: Plot, dispatcher: Dispatcher, batch_size: int, profiler: Profiler = None) -> Iterator[str]:
+    """
+    Executes the actions of the messages by batches, rendering the messages of a same template together.
+    In each batch, other actions are executed first, message by message, then each template renders all its messages
+    with `render_many`, and the outputs are put back in the order of the messages.
+
+    Args:
+        plot (Plot): The plot containing the messages and actions.
+        dispatcher (Dispatcher): The dispatcher of the registered actions.
+        batch_size (int): The number of messages of a batch.
+        profiler (Profiler, optional): If given, the timings of the actions and templates are recorded in it. Defaults to None.
+
+    Returns:
+        Iterator[str]: The outputs of the executed actions, in order.
+    """
+    template_names = dispatcher.template_names
+    outputs = []
+    pending = {}
+    count = 0
+    for message in plot.iter_messages():
+        for action, check, execute in dispatcher.lookup(message):
+            if check is not None:
+                started = time.perf_counter()
+                triggered = check(plot, message)
+                if profiler is not None:
+                    profiler.record_trigger(action, bool(triggered), time.perf_counter() - started)
+                if not triggered:
+                    continue
+            elif profiler is not None:
+                profiler.record_trigger(action, True, 0.0)
+            template_name = template_names.get(action)
+            if template_name is not None:
+                slots, messages = pending.setdefault(template_name, ([], []))
+                slots.append(len(outputs))
+                messages.append(message)
+                outputs.append('')
+                continue
+            started = time.perf_counter()
+            res = execute(plot, message)
+            if profiler is not None:
+                profiler.record_execute(action, time.perf_counter() - started)
+            if type(res) is str:
+                outputs.append(res)
+        count += 1
+        if count == batch_size:
+            yield from render_batch(dispatcher, outputs, pending, profiler)
+            count = 0
+    yield from render_batch(dispatcher, outputs, pending, profiler)
+
+def render_batch(dispatcher: Dispatcher, outputs: list[str], pending: dict[str, tuple[list[int], list[Message]]], profiler: Profiler = None) -> list[str]:
+    """
+    Renders the messages waiting for each template into their slot of the outputs, and empties the batch.
+
+    Args:
+        dispatcher (Dispatcher): The dispatcher holding the templates.
+        outputs (list[str]): The outputs of the batch, with an empty slot for each waiting render.
+        pending (dict[str, tuple[list[int], list[Message]]]): The slots and messages waiting for each template.
+        profiler (Profiler, optional): If given, the template timings are recorded in it. Defaults to None.
+
+    Returns:
+        list[str]: The outputs of the batch.
+    """
+    for template_name, (slots, messages) in pending.items():
+        renders = render_many(dispatcher.templates[template_name], messages)
+        if profiler is None:
+            for slot, res in zip(slots, renders):
+                outputs[slot] = res + '\n'
+            continue
+        for slot in slots:
+            started = time.perf_counter()
+            outputs[slot] = next(renders) + '\n'
+            profiler.record_template(template_name, time.perf_counter() - started)
+    batch = outputs[:]
+    outputs.clear()
+    pending.clear()
+    return batch
+
+
+def run_plot(plot: Plot, dispatcher: Dispatcher, profiler: Profiler = None, batch_size: int = None) -> Iterator[str]:
+    """
+    Executes the actions of a dispatcher for each message, yielding each action output as soon as it is produced.
+
+    Args:
+        plot (Plot): The plot containing the messages.
+        dispatcher (Dispatcher): The dispatcher of the actions.
+        profiler (Profiler, optional): If given, the timings of the actions and templates are recorded in it. Defaults to None.
+        batch_size (int, optional): If given, the messages are played by batches of this size, see `play_batches`. Defaults to None.
+
+    Returns:
+        Iterator[str]: The outputs of the executed actions, in order.
+    """
+    started = time.perf_counter()
+    if batch_size:
+        yield from play_batches(plot, dispatcher, batch_size, profiler)
+    elif profiler is None:
+        for message in plot.iter_messages():
+            yield from dispatcher.run(plot, message)
+        return
+    else:
+        for message in plot.iter_messages():
+            yield from dispatcher.run_profiled(plot, message, profiler)
+    if profiler is not None:
+        profiler.record_phase('play', time.perf_counter() - started)
+
+
+def write_outputs(outputs: Iterator[str], writer: TextIO = None) -> str | None:
+    if writer is None:
+        return ''.join(outputs)
+    for res in outputs:
+        writer.write(res)
+    return None
+
+
+def play_stream(plot: Plot, profiler: Profiler = None, batch_size: int = None, registry: ActionRegistry = None) -> Iterator[str]:
+    """
+    Executes the actions defined in the plot for each message, yielding each action output as soon as it is produced.
+    If the plot was not parsed, it is parsed lazily, so parsing, triggers and rendering run as a pipeline.
+    Actions triggered by a title are looked up by the message title instead of being tried on every message.
+
+    Args:
+        plot (Plot): The plot containing the messages and actions.
+        profiler (Profiler, optional): If given, the timings of the actions and templates are recorded in it. Defaults to None.
+        batch_size (int, optional): If given, the messages are played by batches of this size, see `play_batches`. Defaults to None.
+        registry (ActionRegistry, optional): The registry of the actions. Defaults to `default_registry`.
+
+    Returns:
+        Iterator[str]: The outputs of the executed actions, in order.
+    """
+    started = time.perf_counter()
+    dispatcher = prepare_play(registry)
+    if profiler is not None:
+        profiler.record_phase('play.prepare', time.perf_counter() - started)
+    yield from run_plot(plot, dispatcher, profiler, batch_size)
+
+
+def play(plot: Plot, writer: TextIO = None, profiler: Profiler = None, batch_size: int = None, registry: ActionRegistry = None) -> str | None:
     """
     Executes the actions defined in the plot for each message.
 
     Args:
         plot (Plot): The plot containing the messages and actions.
+        writer (TextIO, optional): If given, each action output is written into it instead of being returned.
+        profiler (Profiler, optional): If given, the timings of the actions and templates are recorded in it. Defaults to None.
+        batch_size (int, optional): If given, the messages are played by batches of this size, and the messages of a same template
+            are rendered together. Template actions then run after the other actions of the batch. Defaults to None.
+        registry (ActionRegistry, optional): The registry of the actions. Defaults to `default_registry`.
 
     Returns:
-        str: The result of executing the actions.
-    """
-    environment = jinja2.Environment(loader=jinja2.FileSystemLoader("./"))
-    for template_name in __templates:
-        __templates[template_name] = environment.get_template(template_name)
-
-    result = ''
-    for message in plot.messages:
-        for action in __plot_actions.values():
-            if action.trigger(plot, message):
-                res = action.execute(plot, message)
-                if type(res) is str:
-                    result += res
-    return result
\ No newline at end of file
+        str | None: The result of executing the actions, or None if a writer was given.
+    """
+    return write_outputs(play_stream(plot, profiler, batch_size, registry), writer)
@@ -0,0 +1,124 @@
+# This file contains the asyncio play engine, running the actions of independent messages concurrently.
+
+from collections import deque
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Hashable, Iterable
+import inspect
+from .pyplot import Message, Plot
+from .action import ActionRegistry, Dispatcher, prepare_play
+
+# asyncio is only imported when a plot is played asynchronously.
+if TYPE_CHECKING:
+    import asyncio
+
+def ordering_keys(message: Message, ordering: str | Callable[[Message], Iterable[Hashable]] | None) -> Iterable[Hashable]:
+    """
+    Gets the keys ordering a message: a message is only played after the previous messages sharing one of its keys.
+
+    Args:
+        message (Message): The message.
+        ordering (str | Callable[[Message], Iterable[Hashable]] | None): 'actor' to keep the order of the messages of each actor,
+            'conversation' to keep the order of the messages between each pair of actors, 'plot' to play the messages one by one,
+            None to play them all concurrently, or a function returning the keys of a message.
+
+    Returns:
+        Iterable[Hashable]: The keys of the message.
+    """
+    if ordering is None:
+        return ()
+    if ordering == 'actor':
+        return (message.sender.name, message.receiver.name)
+    if ordering == 'conversation':
+        return (frozenset((message.sender.name, message.receiver.name)),)
+    if ordering == 'plot':
+        return ('plot',)
+    if callable(ordering):
+        return ordering(message)
+    raise ValueError(f"invalid ordering {ordering!r}, expected 'actor', 'conversation', 'plot', None or a function")
+
+async def run_message(dispatcher: Dispatcher, plot: Plot, message: Message, previous: list['asyncio.Task'], semaphore: 'asyncio.Semaphore') -> str:
+    """
+    Executes the actions triggered by a message, once the messages it is ordered after are played.
+    Triggers and executes may be coroutine functions.
+
+    Args:
+        dispatcher (Dispatcher): The dispatcher of the registered actions.
+        plot (Plot): The plot of the message.
+        message (Message): The message.
+        previous (list[asyncio.Task]): The tasks of the messages to wait for.
+        semaphore (asyncio.Semaphore): Limits the number of messages played at once.
+
+    Returns:
+        str: The outputs of the executed actions, joined.
+    """
+    for task in previous:
+        await task
+    result = []
+    async with semaphore:
+        for action, check, execute in dispatcher.lookup(message):
+            if check is not None:
+                triggered = check(plot, message)
+                if inspect.isawaitable(triggered):
+                    triggered = await triggered
+                if not triggered:
+                    continue
+            res = execute(plot, message)
+            if inspect.isawaitable(res):
+                res = await res
+            if type(res) is str:
+                result.append(res)
+    return ''.join(result)
+
+async def play_async_stream(plot: Plot, concurrency: int = 10, ordering: str | Callable[[Message], Iterable[Hashable]] | None = 'actor',
+                            window: int = None, registry: ActionRegistry = None) -> AsyncIterator[str]:
+    """
+    Plays the messages of a plot concurrently, yielding the output of each message in the order of the messages.
+    If the plot was not parsed, it is parsed lazily, and at most `window` messages are in flight at once.
+
+    Args:
+        plot (Plot): The plot containing the messages and actions.
+        concurrency (int, optional): The maximum number of messages played at once. Defaults to 10.
+        ordering (str | Callable[[Message], Iterable[Hashable]] | None, optional): Which messages must keep their order, see `ordering_keys`. Defaults to 'actor'.
+        window (int, optional): The maximum number of messages started but not yielded yet. Defaults to 4 times `concurrency`.
+        registry (ActionRegistry, optional): The registry of the actions. Defaults to `default_registry`.
+
+    Returns:
+        AsyncIterator[str]: The outputs of the messages, in order.
+    """
+    import asyncio
+    dispatcher = prepare_play(registry)
+    semaphore = asyncio.Semaphore(concurrency)
+    window = window or concurrency * 4
+    last = {}
+    queue = deque()
+    try:
+        for message in plot.iter_messages():
+            keys = ordering_keys(message, ordering)
+            previous = [last[key] for key in keys if key in last]
+            task = asyncio.ensure_future(run_message(dispatcher, plot, message, previous, semaphore))
+            for key in keys:
+                last[key] = task
+            queue.append(task)
+            while len(queue) >= window:
+                yield await queue.popleft()
+        while queue:
+            yield await queue.popleft()
+    finally:
+        for task in queue:
+            task.cancel()
+
+async def play_async(plot: Plot, concurrency: int = 10, ordering: str | Callable[[Message], Iterable[Hashable]] | None = 'actor',
+                     registry: ActionRegistry = None) -> str:
+    """
+    Plays the messages of a plot concurrently, keeping the order of the messages of each actor by default.
+    Triggers and executes may be coroutine functions, so actions waiting on I/O do not block each other.
+
+    Args:
+        plot (Plot): The plot containing the messages and actions.
+        concurrency (int, optional): The maximum number of messages played at once. Defaults to 10.
+        ordering (str | Callable[[Message], Iterable[Hashable]] | None, optional): Which messages must keep their order, see `ordering_keys`. Defaults to 'actor'.
+        registry (ActionRegistry, optional): The registry of the actions. Defaults to `default_registry`.
+
+    Returns:
+        str: The result of executing the actions, in the order of the messages.
+    """
+    return ''.join([res async for res in play_async_stream(plot, concurrency, ordering, registry=registry)])
@@ -0,0 +1,132 @@
+# This file contains the batch mode, playing many plot files across a process pool.
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, Iterator
+import contextlib
+import importlib
+import io
+import itertools
+import os
+from .pyplot import Plot, PlotError
+from .action import play
+from .templates import template_cache, configure_templates
+
+if TYPE_CHECKING:
+    from .cache import PlotCache
+
+@dataclass
+class PlayResult:
+    """
+    Represents the result of playing a plot file.
+
+    Attributes:
+        path (str): The path of the plot file.
+        output (str, optional): The result of `play`, or None if the file failed.
+        error (str, optional): The description of the error, or None if the file was played.
+    """
+
+    path: str
+    output: str = None
+    error: str = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+def find_plots(paths: Iterable[str], extension: str = '.plot') -> Iterator[str]:
+    """
+    Expands directories into the plot files they contain, recursively.
+
+    Args:
+        paths (Iterable[str]): Plot files and directories.
+        extension (str, optional): The extension of the plot files in directories. Defaults to '.plot'.
+
+    Returns:
+        Iterator[str]: The plot files, directories being walked in sorted order.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(extension):
+                    yield os.path.join(root, name)
+
+def play_file(path: str, cache: 'PlotCache' = None, batch_size: int = None) -> PlayResult:
+    """
+    Parses and plays a single plot file, reporting errors instead of raising them.
+
+    Args:
+        path (str): The path of the plot file.
+        cache (PlotCache, optional): The cache of parsed plots. Defaults to None.
+        batch_size (int, optional): If given, the messages are played by batches of this size, see `play`. Defaults to None.
+
+    Returns:
+        PlayResult: The result of the play.
+    """
+    # The parser prints the location of an error, keep it for the result instead.
+    log = io.StringIO()
+    try:
+        plot = Plot(path, path)
+        with contextlib.redirect_stdout(log):
+            plot.parse(cache)
+        return PlayResult(path, output=play(plot, batch_size=batch_size))
+    except PlotError as e:
+        return PlayResult(path, error=log.getvalue() or e.details)
+    except Exception as e:
+        return PlayResult(path, error=log.getvalue() or f"{type(e).__name__}: {e}")
+
+def init_worker(modules: Iterable[str], template_settings: tuple):
+    """
+    Prepares a worker process: imports the modules registering the actions and configures the template cache.
+    The template cache then stays warm for every file the worker plays.
+
+    Args:
+        modules (Iterable[str]): The modules to import.
+        template_settings (tuple): The search path, cache size and bytecode cache directory of the template cache.
+    """
+    configure_templates(*template_settings)
+    for module in modules:
+        importlib.import_module(module)
+
+def play_many(paths: Iterable[str], workers: int = None, ordered: bool = True, modules: Iterable[str] = (), chunksize: int = 1, cache: 'PlotCache' = None,
+              batch_size: int = None) -> Iterator[PlayResult]:
+    """
+    Parses and plays many plot files across a pool of processes.
+    A file that fails is reported in its result and does not stop the batch.
+
+    Actions registered before the call are available in the workers when processes are forked.
+    Otherwise, pass the modules registering them in `modules`, they are imported in each worker.
+
+    Args:
+        paths (Iterable[str]): The plot files to play. Directories are searched for `.plot` files.
+        workers (int, optional): The number of processes. Defaults to the number of CPUs. With 1, files are played in this process.
+        ordered (bool, optional): If True, results are yielded in the order of the files, otherwise as soon as they are ready. Defaults to True.
+        modules (Iterable[str], optional): Modules to import in each worker. Defaults to ().
+        chunksize (int, optional): The number of files sent to a worker at once, when ordered. Defaults to 1.
+        cache (PlotCache, optional): The cache of parsed plots, so unchanged files are not parsed again. Defaults to None.
+        batch_size (int, optional): If given, the messages are played by batches of this size, see `play`. Defaults to None.
+
+    Returns:
+        Iterator[PlayResult]: The results of the plays.
+    """
+    paths = find_plots(paths)
+    modules = tuple(modules)
+    if workers == 1:
+        for module in modules:
+            importlib.import_module(module)
+        for path in paths:
+            yield play_file(path, cache, batch_size)
+        return
+    # Importing the process pool is slow, plays in this process do not need it.
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    template_settings = (template_cache.search_path, template_cache.cache_size, template_cache.bytecode_cache_dir)
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(modules, template_settings)) as executor:
+        if ordered:
+            yield from executor.map(play_file, paths, itertools.repeat(cache), itertools.repeat(batch_size), chunksize=chunksize)
+        else:
+            futures = [executor.submit(play_file, path, cache, batch_size) for path in paths]
+            for future in as_completed(futures):
+                yield future.result()
@@ -0,0 +1,151 @@
+# This file contains the cache of parsed plots, so unchanged plot files are not parsed again.
+
+import hashlib
+import json
+import os
+from .pyplot import Actor, Message, Plot
+
+# Changed whenever the stored representation changes, older cache files are then ignored.
+CACHE_FORMAT_VERSION = 3
+
+class PlotCache:
+    """
+    A cache of parsed plots, stored as compact JSON arrays.
+    The cache files are plain data, loading one never runs code, even if it was written by someone else.
+    Each entry is keyed by the modification time and size of its source file, or by the hash of its content,
+    and by the parser options changing the messages: `lazy` and `keep_content`.
+    The JSON data of plots parsed with `lazy` is stored undecoded. Plots parsed with `use_mmap` are loaded as if parsed with `lazy`,
+    but are not stored: storing them would read their whole content.
+    Actor data is not stored, it is bound to the plot after it is loaded.
+
+    Attributes:
+        directory (str): The directory where the cache files are written, or None to write them next to their source.
+        check (str): 'mtime' to compare the modification time and size of the source, 'hash' to compare the hash of its content.
+
+    Methods:
+        plot_key(self, plot: Plot) -> tuple | None: Computes the key of the current version of the file of a plot.
+        load(self, plot: Plot, key: tuple = None) -> bool: Loads a plot from the cache.
+        store(self, plot: Plot, key: tuple = None): Stores a parsed plot in the cache.
+    """
+
+    def __init__(self, directory: str = None, check: str = 'mtime'):
+        if check not in ('mtime', 'hash'):
+            raise ValueError(f"invalid cache check {check!r}, expected 'mtime' or 'hash'")
+        self.directory = directory
+        self.check = check
+
+    def path_for(self, filename: str | os.PathLike) -> str:
+        """
+        Gets the path of the cache file of a plot file.
+
+        Args:
+            filename (str | os.PathLike): The path of the plot file.
+
+        Returns:
+            str: The path of the cache file.
+        """
+        if self.directory is None:
+            return os.fspath(filename) + 'c'
+        digest = hashlib.sha1(os.path.abspath(filename).encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"{os.path.basename(filename)}-{digest}.plotc")
+
+    def key_for(self, filename: str) -> tuple:
+        """
+        Computes the key identifying the current version of a plot file.
+
+        Args:
+            filename (str): The path of the plot file.
+
+        Returns:
+            tuple: The key of the file.
+        """
+        if self.check == 'hash':
+            # Hashed by chunks, so large plots are not read into memory at once.
+            digest = hashlib.sha256()
+            with open(filename, 'rb') as file:
+                for chunk in iter(lambda: file.read(1 << 16), b''):
+                    digest.update(chunk)
+            return ('hash', digest.hexdigest())
+        stat = os.stat(filename)
+        return ('mtime', stat.st_mtime_ns, stat.st_size)
+
+    def plot_key(self, plot: Plot) -> tuple | None:
+        """
+        Computes the key identifying the current version of the file of a plot, and the options it is parsed with.
+
+        Args:
+            plot (Plot): The plot.
+
+        Returns:
+            tuple | None: The key of the plot, or None if the plot is not read from a file and cannot be cached.
+        """
+        parser = plot.parser
+        if not isinstance(parser.source, (str, os.PathLike)):
+            return None
+        return (*self.key_for(parser.source), parser.lazy or parser.use_mmap, parser.keep_content)
+
+    def load(self, plot: Plot, key: tuple = None) -> bool:
+        """
+        Loads a plot from the cache, if its source did not change since it was stored.
+
+        Args:
+            plot (Plot): The plot to fill with the actors and messages.
+            key (tuple, optional): The key of the file, see `plot_key`. Defaults to the current key.
+
+        Returns:
+            bool: True if the plot was loaded, False if it must be parsed.
+        """
+        if key is None:
+            key = self.plot_key(plot)
+            if key is None:
+                return False
+        filename = plot.parser.source
+        # A cache file may be damaged or written by another version, any unexpected structure means the plot must be parsed.
+        try:
+            with open(self.path_for(filename), 'r', encoding='utf-8') as file:
+                version, stored_key, actors, messages = json.load(file)
+            if version != CACHE_FORMAT_VERSION or tuple(stored_key) != key:
+                return False
+            actors = [Actor(name, column) for column, name in enumerate(actors)]
+            messages = [
+                Message(sender=actors[sender], receiver=actors[receiver], bydirectional=bydirectional,
+                        content=content, line=line, order=order, title=title, data=data, raw_data=raw_data)
+                for sender, receiver, bydirectional, content, line, order, title, data, raw_data in messages
+            ]
+        except (OSError, ValueError, TypeError, IndexError):
+            return False
+        plot.set_actors(actors)
+        plot.messages = messages
+        return True
+
+    def store(self, plot: Plot, key: tuple = None):
+        """
+        Stores a parsed plot in the cache.
+        The cache file is replaced atomically, so concurrent readers never see a partial file.
+
+        Args:
+            plot (Plot): The parsed plot.
+            key (tuple, optional): The key of the file, taken before it was parsed, see `plot_key`. Defaults to the current key,
+                which is wrong if the file was saved during the parse.
+        """
+        if plot.parser.use_mmap:
+            return
+        if key is None:
+            key = self.plot_key(plot)
+            if key is None:
+                return
+        filename = plot.parser.source
+        actors = [actor.name for actor in plot.actors]
+        # The data of lazy messages is stored as its JSON text, so storing does not decode it.
+        messages = [
+            (message.sender.column, message.receiver.column, message.bydirectional, message.content, message.line, message.order,
+             message.title, None if message.raw_data is not None else message.data, message.raw_data)
+            for message in plot.messages
+        ]
+        path = self.path_for(filename)
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump((CACHE_FORMAT_VERSION, key, actors, messages), file, separators=(',', ':'))
+        os.replace(temporary, path)
@@ -1,6 +1,5 @@
-from .action import ActionOverloadError
+from .action import ActionOverloadError, title_trigger
 from .pyplot import Actor, Message, Plot
-import jinja2
 
 def trigger(function):
     def decorator(classDefinition):
@@ -19,7 +18,7 @@ def execute(function):
 def trigger_on_title(message_title: str):
     def decorator(classDefinition):
         if not hasattr(classDefinition, 'trigger'):
-            setattr(classDefinition, 'trigger', lambda plot, message: message.title.upper() == message_title)
+            setattr(classDefinition, 'trigger', title_trigger(message_title, upper=True))
         return classDefinition
     return decorator
 
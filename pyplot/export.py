@@ -0,0 +1,129 @@
+# This file contains the exporter, rendering a parsed plot back into a sequence diagram.
+
+from typing import Iterable, TextIO
+import json
+
+# Reused for every message, json.dumps would build a new encoder each time.
+JSON_ENCODER = json.JSONEncoder(indent=4)
+
+class PlotExporter:
+    """
+    Renders messages as the lines of a sequence diagram.
+    The geometry of the diagram is computed once for the actors, and each arrow is built once per
+    (left column, right column, direction) and then reused, so rendering is linear in the number of messages.
+
+    Attributes:
+        actors (list[Actor]): The actors of the plot.
+        head (str): The line naming the actors.
+        empty_line (str): A line with only the actor columns.
+        arrows (dict[tuple[int, int, str], str]): The arrows already built, by left column, right column and removed arrow head.
+
+    Methods:
+        arrow(self, left: int, right: int, to_replace: str) -> str: Gets the arrow between two columns.
+        render_message(self, message: Message) -> str: Renders the lines of a message.
+        write(self, messages: Iterable[Message], writer: TextIO): Writes the diagram into a writer.
+        export(self, messages: Iterable[Message]) -> str: Renders the diagram.
+    """
+
+    def __init__(self, actors: list):
+        self.actors = actors
+        actor_max_width = max([len(actor.name) for actor in actors])
+        column_width = max(actor_max_width, 15)
+        self.head = (' ' * (max(column_width - actor_max_width, 1))).join([actor.name for actor in actors])
+        self.arrow_right = '-' * (column_width - 1) + '>'
+        self.arrow_left = '<' + '-' * (column_width - 1)
+        self.arrow_both = '<' + '-' * (column_width - 2) + '>'
+        self.arrow_blank = ' ' * column_width
+        self.arrow_line = '-' * column_width
+        self.empty_line = ('|' + self.arrow_blank) * (len(actors) - 1) + '|'
+        self.continuation = '\n' + self.empty_line + ' '
+        self.arrows = {}
+
+    def arrow(self, left: int, right: int, to_replace: str) -> str:
+        """
+        Gets the arrow between two columns, followed by the space before the message.
+
+        Args:
+            left (int): The leftmost column of the message.
+            right (int): The rightmost column of the message.
+            to_replace (str): The arrow head to remove for a one way message, or '' for a bidirectional message.
+
+        Returns:
+            str: The arrow line, without the message.
+        """
+        key = (left, right, to_replace)
+        arrow = self.arrows.get(key)
+        if arrow is not None:
+            return arrow
+        arrow = ''
+        for afrom, ato in zip(self.actors, self.actors[1:]):
+            if afrom.column == left and ato.column == right:
+                arrow += '|' + self.arrow_both
+            elif afrom.column == left:
+                arrow += '|' + self.arrow_left
+            elif ato.column == right:
+                arrow += '-' + self.arrow_right
+            elif afrom.column > left and ato.column < right:
+                arrow += '-' + self.arrow_line
+            else:
+                arrow += '|' + self.arrow_blank
+        arrow += '|'
+        if to_replace:
+            arrow = arrow.replace(to_replace, '-')
+        arrow += ' '
+        self.arrows[key] = arrow
+        return arrow
+
+    def render_message(self, message) -> str:
+        """
+        Renders the lines of a message, without the empty line following it.
+
+        Args:
+            message (Message): The message to render.
+
+        Returns:
+            str: The arrow line of the message and the lines of its content.
+        """
+        sender_col = message.sender.column
+        receiver_col = message.receiver.column
+        if message.bydirectional:
+            to_replace = ''
+        else:
+            to_replace = '<' if sender_col < receiver_col else '>'
+        arrow = self.arrow(min(sender_col, receiver_col), max(sender_col, receiver_col), to_replace)
+        data = message.data
+        if data:
+            text = message.title + ' ' + JSON_ENCODER.encode(data)
+        else:
+            text = message.title + ' ' + message.content
+        return arrow + text.replace('\n', self.continuation)
+
+    def write(self, messages: Iterable, writer: TextIO):
+        """
+        Writes the diagram into a writer, one message at a time.
+
+        Args:
+            messages (Iterable[Message]): The messages to render.
+            writer (TextIO): Where the diagram is written.
+        """
+        empty_line = self.empty_line
+        writer.write(self.head + '\n' + empty_line)
+        for message in messages:
+            writer.write('\n' + self.render_message(message) + '\n' + empty_line)
+
+    def export(self, messages: Iterable) -> str:
+        """
+        Renders the diagram.
+
+        Args:
+            messages (Iterable[Message]): The messages to render.
+
+        Returns:
+            str: The diagram.
+        """
+        empty_line = self.empty_line
+        lines = [self.head, empty_line]
+        for message in messages:
+            lines.append(self.render_message(message))
+            lines.append(empty_line)
+        return '\n'.join(lines)
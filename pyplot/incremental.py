@@ -0,0 +1,215 @@
+# This file contains the incremental mode, updating a parsed and played plot when some of its lines change.
+
+from bisect import bisect_left
+from typing import Callable
+import os
+import sys
+import time
+from .pyplot import Plot, PlotError, is_arrow_line
+from .action import ActionRegistry, prepare_play
+
+class IncrementalPlot:
+    """
+    A plot kept parsed and played, that can be updated for a changed range of lines.
+    Only the messages around the changed lines are parsed again, and only the messages that changed are played again.
+    A message whose order or line number moved is played again too, as its output may show them.
+
+    Attributes:
+        title (str): The title of the plot.
+        filename (str): The filename of the plot.
+        lines (list[str]): The lines of the plot.
+        plot (Plot): The parsed plot.
+        outputs (list[str]): The output of each message.
+        duration (float): The time taken by the last load or update, in seconds.
+        registry (ActionRegistry): The registry of the actions, or None for the default registry.
+
+    Methods:
+        load(self, lines: list[str] = None): Parses and plays the whole plot.
+        update(self, start: int, end: int, new_lines: list[str]) -> list[int]: Replaces a range of lines.
+        result(self) -> str: Gets the result of playing the plot.
+    """
+
+    def __init__(self, title: str, filename: str, registry: ActionRegistry = None):
+        self.title = title
+        self.filename = filename
+        self.lines = []
+        self.plot = None
+        self.outputs = []
+        self.dispatcher = None
+        self.duration = 0.0
+        self.registry = registry
+
+    def load(self, lines: list[str] = None):
+        """
+        Parses and plays the whole plot.
+
+        Args:
+            lines (list[str], optional): The lines of the plot. Defaults to the lines of the file.
+
+        Raises:
+            PlotError: If the plot is invalid.
+        """
+        started = time.perf_counter()
+        if lines is None:
+            with open(self.filename, 'r') as file:
+                lines = file.read().split('\n')
+        plot = Plot(self.title, lines)
+        plot.parse()
+        self.lines = lines
+        self.plot = plot
+        self.dispatcher = prepare_play(self.registry)
+        self.outputs = [self.render(message) for message in plot.messages]
+        self.duration = time.perf_counter() - started
+
+    def render(self, message) -> str:
+        return ''.join(self.dispatcher.run(self.plot, message))
+
+    def result(self) -> str:
+        return ''.join(self.outputs)
+
+    def update(self, start: int, end: int, new_lines: list[str]) -> list[int]:
+        """
+        Replaces the lines from `start` to `end` (excluded) with new lines, and updates the messages and outputs.
+        If the update is invalid, the plot is left unchanged.
+
+        Args:
+            start (int): The index of the first replaced line.
+            end (int): The index following the last replaced line.
+            new_lines (list[str]): The new lines.
+
+        Raises:
+            PlotError: If the new lines are invalid.
+
+        Returns:
+            list[int]: The orders of the messages that were played again.
+        """
+        started = time.perf_counter()
+        if start == 0:
+            # The actors changed, everything must be parsed again.
+            self.load(self.lines[:start] + new_lines + self.lines[end:])
+            return list(range(len(self.outputs)))
+        messages = self.plot.messages
+        starts = [message.line - 1 for message in messages]
+        # The message before the change may be extended by it, the first message after it is kept if it still opens on an arrow.
+        first = max(bisect_left(starts, start) - 1, 0)
+        stop = bisect_left(starts, end)
+        while stop < len(messages) and not is_arrow_line(self.lines[starts[stop]]):
+            stop += 1
+        region_start = starts[first] if messages and starts[first] < start else 1
+        region_end = starts[stop] if stop < len(messages) else len(self.lines)
+        delta = len(new_lines) - (end - start)
+        lines = self.lines[region_start:start] + new_lines + self.lines[end:region_end]
+        new_messages = list(self.plot.parser.parse_messages(lines, region_start - 1, first))
+
+        old_messages = messages[first:stop]
+        old_outputs = self.outputs[first:stop]
+        kept_before = 0
+        while kept_before < min(len(old_messages), len(new_messages)) and same_message(old_messages[kept_before], new_messages[kept_before]):
+            kept_before += 1
+        kept_after = 0
+        while kept_after < min(len(old_messages), len(new_messages)) - kept_before and \
+                same_message(old_messages[-1 - kept_after], new_messages[-1 - kept_after]):
+            kept_after += 1
+        new_outputs = old_outputs[:kept_before]
+        changed = []
+        for message in new_messages[kept_before:len(new_messages) - kept_after]:
+            new_outputs.append(self.render(message))
+            changed.append(message.order)
+        new_outputs += old_outputs[len(old_outputs) - kept_after:]
+
+        after = messages[stop:]
+        after_outputs = self.outputs[stop:]
+        if delta or len(new_messages) != len(old_messages):
+            # The messages after the change moved, their outputs may show their order or line number.
+            positions = [(message.line, message.order) for message in after]
+            try:
+                for order, message in enumerate(after, first + len(new_messages)):
+                    message.line += delta
+                    message.order = order
+                after_outputs = [self.render(message) for message in after]
+            except BaseException:
+                for message, (line, order) in zip(after, positions):
+                    message.line, message.order = line, order
+                raise
+            changed += [message.order for message in after]
+        self.lines[start:end] = new_lines
+        self.plot.messages = messages[:first] + new_messages + after
+        self.outputs = self.outputs[:first] + new_outputs + after_outputs
+        self.duration = time.perf_counter() - started
+        return changed
+
+def same_message(old, new) -> bool:
+    """
+    Tells if a message parsed again is the same as before, at the same order and line number.
+    """
+    return old.sender.column == new.sender.column and old.receiver.column == new.receiver.column and \
+        old.bydirectional == new.bydirectional and old.title == new.title and \
+        old.content == new.content and old.data == new.data and \
+        old.order == new.order and old.line == new.line
+
+def changed_range(old_lines: list[str], new_lines: list[str]) -> tuple[int, int, list[str]] | None:
+    """
+    Finds the range of lines that changed between two versions of a file.
+
+    Args:
+        old_lines (list[str]): The previous lines.
+        new_lines (list[str]): The current lines.
+
+    Returns:
+        tuple[int, int, list[str]] | None: The start and end of the changed range in the previous lines and its new lines,
+            or None if nothing changed.
+    """
+    size = min(len(old_lines), len(new_lines))
+    start = 0
+    while start < size and old_lines[start] == new_lines[start]:
+        start += 1
+    if start == len(old_lines) == len(new_lines):
+        return None
+    common_end = 0
+    while common_end < size - start and old_lines[-1 - common_end] == new_lines[-1 - common_end]:
+        common_end += 1
+    return start, len(old_lines) - common_end, new_lines[start:len(new_lines) - common_end]
+
+def watch(filename: str, on_change: Callable[[IncrementalPlot, list[int]], None], interval: float = 0.2, title: str = None):
+    """
+    Watches a plot file and updates it incrementally whenever it is saved.
+    Invalid versions of the file, and errors raised while playing them, are reported and skipped. This function returns on KeyboardInterrupt.
+
+    Args:
+        filename (str): The plot file.
+        on_change (Callable[[IncrementalPlot, list[int]], None]): Called after each update with the plot and the orders of the messages played again.
+        interval (float, optional): The time between two checks of the file, in seconds. Defaults to 0.2.
+        title (str, optional): The title of the plot. Defaults to the filename.
+    """
+    incremental = IncrementalPlot(title or filename, filename)
+    mtime = None
+    try:
+        while True:
+            try:
+                current_mtime = os.stat(filename).st_mtime_ns
+            except OSError:
+                # Editors saving atomically replace the file, it may be missing for a moment.
+                current_mtime = mtime
+            if current_mtime != mtime:
+                mtime = current_mtime
+                try:
+                    if incremental.plot is None:
+                        incremental.load()
+                        on_change(incremental, list(range(len(incremental.outputs))))
+                    else:
+                        with open(filename, 'r') as file:
+                            change = changed_range(incremental.lines, file.read().split('\n'))
+                        if change is not None:
+                            on_change(incremental, incremental.update(*change))
+                except PlotError:
+                    # The parser already reported the error.
+                    pass
+                except OSError as e:
+                    print(f"Error reading {filename}: {e}", file=sys.stderr)
+                    # The file is read again at the next check.
+                    mtime = None
+                except Exception as e:
+                    print(f"Error updating {filename}: {e!r}", file=sys.stderr)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        return
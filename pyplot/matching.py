@@ -0,0 +1,174 @@
+# This file contains the declarative matchers, compiled by the dispatcher into a lookup shared by all actions.
+
+from typing import Any, Iterable
+
+class AnyValue:
+    """
+    Placeholder matching any value of a data key, as long as the key is present.
+    """
+
+    def __repr__(self):
+        return 'ANY'
+
+ANY = AnyValue()
+
+DIRECTIONS = ('right', 'left', 'both')
+
+def message_direction(message) -> str:
+    """
+    Gets the direction of a message: 'right' when the arrow points to the right, 'left' when it points to the left,
+    'both' for a bidirectional message.
+    """
+    if message.bydirectional:
+        return 'both'
+    return 'right' if message.sender.column < message.receiver.column else 'left'
+
+def data_matches(pattern: dict, data: Any) -> bool:
+    """
+    Tells if JSON data matches a pattern. Each key of the pattern must be in the data, with an equal value,
+    any value for ANY, or a value matching it for a nested pattern.
+
+    Args:
+        pattern (dict): The pattern.
+        data (Any): The data.
+
+    Returns:
+        bool: True if the data matches.
+    """
+    if not isinstance(data, dict):
+        return False
+    for key, expected in pattern.items():
+        if key not in data:
+            return False
+        if expected is ANY:
+            continue
+        value = data[key]
+        if isinstance(expected, dict):
+            if not data_matches(expected, value):
+                return False
+        elif value != expected:
+            return False
+    return True
+
+def to_values(value: str | Iterable[str] | None) -> frozenset | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return frozenset((value,))
+    return frozenset(value)
+
+class Match:
+    """
+    A declarative trigger. Each given criterion must hold, and a criterion given several values matches any of them.
+    It can be called as a trigger, but the dispatcher compiles all the matchers of the registered actions into one
+    lookup, so each message is resolved at once instead of calling each trigger.
+
+    Attributes:
+        titles (frozenset[str] | None): The titles of the message.
+        upper (bool): If True, the message title is upper-cased before comparing it.
+        senders (frozenset[str] | None): The names of the sender.
+        receivers (frozenset[str] | None): The names of the receiver.
+        directions (frozenset[str] | None): The directions of the message, 'right', 'left' or 'both'.
+        data (dict | None): The pattern the JSON data must match, see `data_matches`.
+
+    Methods:
+        match_data(self, plot: Plot, message: Message) -> bool: Checks only the data pattern.
+    """
+
+    __slots__ = ('titles', 'upper', 'senders', 'receivers', 'directions', 'data')
+
+    def __init__(self, title: str | Iterable[str] = None, sender: str | Iterable[str] = None, receiver: str | Iterable[str] = None,
+                 direction: str | Iterable[str] = None, data: dict = None, upper: bool = False):
+        self.titles = to_values(title)
+        self.upper = upper
+        self.senders = to_values(sender)
+        self.receivers = to_values(receiver)
+        self.directions = to_values(direction)
+        if self.directions is not None and not self.directions <= set(DIRECTIONS):
+            raise ValueError(f"invalid direction {direction!r}, expected 'right', 'left' or 'both'")
+        self.data = data or None
+
+    def match_data(self, plot, message) -> bool:
+        return self.data is None or data_matches(self.data, message.data)
+
+    def __call__(self, plot, message) -> bool:
+        if self.titles is not None:
+            title = message.title.upper() if self.upper else message.title
+            if title not in self.titles:
+                return False
+        if self.senders is not None and message.sender.name not in self.senders:
+            return False
+        if self.receivers is not None and message.receiver.name not in self.receivers:
+            return False
+        if self.directions is not None and message_direction(message) not in self.directions:
+            return False
+        return self.match_data(plot, message)
+
+    def __repr__(self):
+        criteria = [f"{name}={value!r}" for name, value in (
+            ('title', self.titles), ('sender', self.senders), ('receiver', self.receivers),
+            ('direction', self.directions), ('data', self.data)) if value is not None]
+        if self.upper:
+            criteria.append('upper=True')
+        return f"Match({', '.join(criteria)})"
+
+class MatchIndex:
+    """
+    Matchers compiled into one hash table per message field. For each field, a matcher is either indexed under
+    its values, or is a wildcard. The matchers of a message are the intersection, over the fields, of the matchers
+    indexed under its value and the wildcards.
+
+    Attributes:
+        values (dict[str, dict[str, set[int]]]): The positions of the matchers, by field and value.
+        wildcards (dict[str, set[int]]): The positions of the matchers not constraining each field.
+        positions (set[int]): The positions of all the matchers.
+
+    Methods:
+        add(self, position: int, match: Match): Indexes a matcher.
+        message_fields(self) -> tuple[str, ...]: Gets the fields other than the title used by the matchers.
+        resolve(self, title: str, sender: str, receiver: str, direction: str) -> set[int]: Gets the matchers of a message.
+    """
+
+    FIELDS = ('title', 'upper_title', 'sender', 'receiver', 'direction')
+
+    def __init__(self):
+        self.values = {field: {} for field in self.FIELDS}
+        self.wildcards = {field: set() for field in self.FIELDS}
+        self.positions = set()
+
+    def add(self, position: int, match: Match):
+        self.positions.add(position)
+        title_field = 'upper_title' if match.upper else 'title'
+        for field, values in (('title', match.titles if title_field == 'title' else None),
+                              ('upper_title', match.titles if title_field == 'upper_title' else None),
+                              ('sender', match.senders), ('receiver', match.receivers), ('direction', match.directions)):
+            if values is None:
+                self.wildcards[field].add(position)
+            else:
+                for value in values:
+                    self.values[field].setdefault(value, set()).add(position)
+
+    def message_fields(self) -> tuple[str, ...]:
+        return tuple(field for field in ('sender', 'receiver', 'direction') if self.values[field])
+
+    def resolve(self, title: str, sender: str = None, receiver: str = None, direction: str = None) -> set[int]:
+        """
+        Gets the matchers of a message, ignoring their data patterns.
+
+        Args:
+            title (str): The title of the message.
+            sender (str, optional): The name of the sender, needed if a matcher uses it.
+            receiver (str, optional): The name of the receiver, needed if a matcher uses it.
+            direction (str, optional): The direction of the message, needed if a matcher uses it.
+
+        Returns:
+            set[int]: The positions of the matchers.
+        """
+        upper_title = title.upper() if isinstance(title, str) else title
+        result = self.positions
+        for field, value in (('title', title), ('upper_title', upper_title), ('sender', sender),
+                             ('receiver', receiver), ('direction', direction)):
+            result = result & (self.values[field].get(value, set()) | self.wildcards[field])
+            if not result:
+                break
+        return result
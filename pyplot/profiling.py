@@ -0,0 +1,137 @@
+# This file contains the profiler, recording where the time of parse() and play() is spent.
+
+from dataclasses import dataclass, asdict
+from typing import Callable
+
+@dataclass
+class ActionStats:
+    """
+    Statistics of an action.
+
+    Attributes:
+        trigger_calls (int): The number of messages the action was considered for, called or matched by title.
+        trigger_hits (int): The number of messages that triggered the action.
+        trigger_time (float): The time spent in the trigger, in seconds. Actions matched by title cost nothing here.
+        execute_calls (int): The number of executions.
+        execute_time (float): The time spent in execute, in seconds.
+    """
+
+    trigger_calls: int = 0
+    trigger_hits: int = 0
+    trigger_time: float = 0.0
+    execute_calls: int = 0
+    execute_time: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.trigger_hits / self.trigger_calls if self.trigger_calls else 0.0
+
+@dataclass
+class TemplateStats:
+    """
+    Statistics of a template.
+
+    Attributes:
+        renders (int): The number of renders.
+        render_time (float): The time spent rendering, in seconds.
+    """
+
+    renders: int = 0
+    render_time: float = 0.0
+
+class Profiler:
+    """
+    Records per-action, per-template and per-phase timings of `Plot.parse` and `play`.
+    Pass it to `Plot.parse(profiler=...)` and `play(..., profiler=...)`. Without a profiler, nothing is measured.
+
+    Hooks are called with every measure, as `hook(event, name, duration)`, where event is one of
+    'trigger', 'execute', 'template' and 'phase', to forward the measures to a metrics pipeline.
+
+    Attributes:
+        actions (dict[str, ActionStats]): The statistics of each action, by class name.
+        templates (dict[str, TemplateStats]): The statistics of each template, by template name.
+        phases (dict[str, float]): The time spent in each phase, in seconds.
+        hooks (list[Callable[[str, str, float], None]]): The hooks called with each measure.
+
+    Methods:
+        add_hook(self, hook): Adds a hook.
+        report(self) -> dict: Gets the statistics as plain data.
+        summary(self) -> str: Gets the statistics as a text table.
+    """
+
+    def __init__(self):
+        self.actions = {}
+        self.templates = {}
+        self.phases = {}
+        self.hooks = []
+
+    def add_hook(self, hook: Callable[[str, str, float], None]):
+        self.hooks.append(hook)
+
+    def notify(self, event: str, name: str, duration: float):
+        for hook in self.hooks:
+            hook(event, name, duration)
+
+    def action_stats(self, action) -> ActionStats:
+        stats = self.actions.get(action.__name__)
+        if stats is None:
+            stats = self.actions[action.__name__] = ActionStats()
+        return stats
+
+    def record_trigger(self, action, hit: bool, duration: float):
+        stats = self.action_stats(action)
+        stats.trigger_calls += 1
+        stats.trigger_hits += hit
+        stats.trigger_time += duration
+        self.notify('trigger', action.__name__, duration)
+
+    def record_execute(self, action, duration: float):
+        stats = self.action_stats(action)
+        stats.execute_calls += 1
+        stats.execute_time += duration
+        self.notify('execute', action.__name__, duration)
+
+    def record_template(self, name: str, duration: float):
+        stats = self.templates.get(name)
+        if stats is None:
+            stats = self.templates[name] = TemplateStats()
+        stats.renders += 1
+        stats.render_time += duration
+        self.notify('template', name, duration)
+
+    def record_phase(self, name: str, duration: float):
+        self.phases[name] = self.phases.get(name, 0.0) + duration
+        self.notify('phase', name, duration)
+
+    def report(self) -> dict:
+        """
+        Gets the statistics as plain data, ready to be dumped as JSON.
+
+        Returns:
+            dict: The phases, actions and templates statistics.
+        """
+        return {
+            'phases': dict(self.phases),
+            'actions': {name: dict(asdict(stats), hit_rate=stats.hit_rate) for name, stats in self.actions.items()},
+            'templates': {name: asdict(stats) for name, stats in self.templates.items()},
+        }
+
+    def summary(self) -> str:
+        """
+        Gets the statistics as a text table, the slowest first.
+
+        Returns:
+            str: The statistics.
+        """
+        lines = ['phase                           seconds']
+        for name, duration in sorted(self.phases.items(), key=lambda item: -item[1]):
+            lines.append(f"{name:<30} {duration:>8.4f}")
+        lines.append('')
+        lines.append('action                          calls   hits  hit rate  trigger s  execute s')
+        for name, stats in sorted(self.actions.items(), key=lambda item: -(item[1].trigger_time + item[1].execute_time)):
+            lines.append(f"{name:<30} {stats.trigger_calls:>6} {stats.trigger_hits:>6} {stats.hit_rate:>9.1%} {stats.trigger_time:>10.4f} {stats.execute_time:>10.4f}")
+        lines.append('')
+        lines.append('template                        renders  render s')
+        for name, stats in sorted(self.templates.items(), key=lambda item: -item[1].render_time):
+            lines.append(f"{name:<30} {stats.renders:>8} {stats.render_time:>9.4f}")
+        return '\n'.join(lines)
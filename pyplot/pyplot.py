@@ -1,8 +1,54 @@
 # This file contains the Plot class, which is the main class of the library.
 
 from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Iterable, Iterator, Mapping, TextIO
+import mmap
+import os
 import re
 import json
+import sys
+import time
+
+from .export import PlotExporter
+
+if TYPE_CHECKING:
+    from .cache import PlotCache
+    from .profiling import Profiler
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Actor names, on the first line of a plot.
+REGEX_ACTORS = re.compile(r"[A-Za-z0-9_-]+")
+# The columns and arrow at the start of a line, before its content.
+REGEX_COLUMNS = re.compile(r"[\t |<>-]*")
+REGEX_COLUMNS_BYTES = re.compile(rb"[\t |<>-]*")
+REGEX_ARROW = re.compile(r"-+")
+# The JSON tokens changing the nesting depth: strings, that may hold braces, and braces.
+REGEX_JSON_TOKENS = re.compile(r'"(?:[^"\\]|\\.)*"|[{}]')
+# orjson turns integers over 64 bits into floats, such payloads are left to json.
+REGEX_BIG_INTEGER = re.compile(r"\d{19}")
+# Removes everything but the arrow heads from the columns of a line.
+ARROW_HEADS = str.maketrans('', '', '\t |-')
+
+def is_arrow_line(line: str) -> bool:
+    """
+    Tells if a line may open a new message, that is it starts with `|` and has a `-` followed by a `|`.
+    This is the same as matching `\\|.*-.*\\|.*`, without the regex backtracking on long lines.
+
+    Args:
+        line (str): The line to check.
+
+    Returns:
+        bool: True if the line may open a new message.
+    """
+    if not line.startswith('|'):
+        return False
+    dash = line.find('-', 1)
+    return dash != -1 and line.find('|', dash + 1) != -1
 
 class PlotError(Exception):
     """
@@ -33,24 +79,96 @@ class Plot:
 
     Attributes:
         title (str): The title of the plot.
-        filename (str): The filename of the plot.
+        filename (str | TextIO | Iterable[str]): The filename of the plot, or an open file / iterable of lines.
         actors (list): A list of actors in the plot.
+        actors_by_name (dict[str, Actor]): The actors, by name. For duplicated names, the first actor is kept.
         messages (list): A list of messages in the plot.
         parser (PlotParser): The parser used to parse the plot file.
 
     Methods:
-        __init__(self, title: str, filename: str): Initializes a new Plot object.
-        parse(self): Parses the plot file using the parser.
+        __init__(self, title: str, filename: str | TextIO | Iterable[str], lazy: bool = False, keep_content: bool = True, use_mmap: bool = False):
+            Initializes a new Plot object. `lazy`, `keep_content` and `use_mmap` are passed to the parser.
+        parse(self, cache: PlotCache = None, profiler: Profiler = None): Parses the plot file using the parser, or loads it from a cache.
+        iter_messages(self): Iterates over the messages, parsing them lazily if the plot was not parsed.
+        set_actors(self, actors: list[Actor]): Sets the actors and indexes them by name.
+        get_actor(self, name: str) -> Actor | None: Gets an actor by name.
+        set_actor_data(self, data: dict[str, str], actor_name: str) -> bool: Sets the data of an actor.
+        set_actors_data(self, actors_data: Mapping[str, dict[str, str]]) -> list[str]: Sets the data of many actors.
     """
-    def __init__(self, title: str, filename: str):
+    def __init__(self, title: str, filename: str | TextIO | Iterable[str], lazy: bool = False, keep_content: bool = True, use_mmap: bool = False):
         self.title = title
         self.filename = filename
         self.actors = []
+        self.actors_by_name = {}
         self.messages = []
-        self.parser = PlotParser(filename, self)
+        self.parsed = False
+        self.parser = PlotParser(filename, self, lazy=lazy, keep_content=keep_content, use_mmap=use_mmap)
 
-    def parse(self):
+    def parse(self, cache: 'PlotCache' = None, profiler: 'Profiler' = None):
+        """
+        Parses the plot file.
+
+        Args:
+            cache (PlotCache, optional): If given, the plot is loaded from this cache when its file did not change,
+                and stored in it after being parsed otherwise. Defaults to None.
+            profiler (Profiler, optional): If given, the time spent in each parse phase is recorded in it. Defaults to None.
+        """
+        started = time.perf_counter()
+        key = None
+        if cache is not None:
+            # The key is taken before parsing, so a file saved during the parse is not stored under its new key.
+            key = cache.plot_key(self)
+            if key is not None and cache.load(self, key):
+                self.parsed = True
+                if profiler is not None:
+                    profiler.record_phase('parse.cache_load', time.perf_counter() - started)
+                return
+        self.parser.profiler = profiler
         self.parser.parse()
+        self.parsed = True
+        if profiler is not None:
+            profiler.record_phase('parse', time.perf_counter() - started)
+        if key is not None:
+            stored = time.perf_counter()
+            cache.store(self, key)
+            if profiler is not None:
+                profiler.record_phase('parse.cache_store', time.perf_counter() - stored)
+
+    def iter_messages(self) -> Iterator['Message']:
+        """
+        Iterates over the messages of the plot.
+        If the plot was not parsed yet, the messages are parsed lazily and are not stored in the plot.
+
+        Returns:
+            Iterator[Message]: The messages of the plot, in order.
+        """
+        if self.parsed:
+            return iter(self.messages)
+        return self.parser.stream()
+
+    def set_actors(self, actors: list['Actor']):
+        """
+        Sets the actors of the plot and indexes them by name.
+
+        Args:
+            actors (list[Actor]): The actors, in column order.
+        """
+        self.actors = actors
+        self.actors_by_name = {}
+        for actor in actors:
+            self.actors_by_name.setdefault(actor.name, actor)
+
+    def get_actor(self, name: str) -> 'Actor | None':
+        """
+        Gets an actor by name.
+
+        Args:
+            name (str): The name of the actor.
+
+        Returns:
+            Actor | None: The actor, or None if the plot has no actor with this name.
+        """
+        return self.actors_by_name.get(name)
 
     def set_actor_data(self, data: dict[str, str], actor_name: str) -> bool:
         """
@@ -63,60 +181,50 @@ class Plot:
         Returns:
             bool: True if the actor was found and the data was set, False otherwise.
         """
-        for actor in self.actors:
-            if actor.name == actor_name:
-                actor.data = data
-                return True
-        return False
+        actor = self.actors_by_name.get(actor_name)
+        if actor is None:
+            return False
+        actor.data = data
+        return True
 
-    def export(self) -> str:
-        lines = []
-        actor_max_width = max([len(actor.name) for actor in self.actors])
-        column_width = max(actor_max_width, 15)
-        head = (' ' * (max(column_width - actor_max_width, 1))).join([actor.name for actor in self.actors])
-        lines.append(head)
-        arrow_right = '-' * (column_width - 1) + '>'
-        arrow_left = '<' + '-' * (column_width - 1)
-        arrow_both = '<' + '-' * (column_width - 2) + '>'
-        arrow_blank = ' ' * column_width
-        arrow_line = '-' * column_width
-        empty_line = ('|' + arrow_blank) * (len(self.actors) - 1) + '|'
-        lines.append(empty_line)
-        for message in self.messages:
-            message: Message
-            sender_col = message.sender.column
-            receiver_col = message.receiver.column
-            left = min(sender_col, receiver_col)
-            right = max(sender_col, receiver_col)
-            line = ''
-            for afrom, ato in zip(self.actors, self.actors[1:]):
-                afrom : Actor
-                ato : Actor
-                if afrom.column == left and ato.column == right:
-                    line += '|' + arrow_both
-                elif afrom.column == left:
-                    line += '|' + arrow_left
-                elif ato.column == right:
-                    line += '-' + arrow_right
-                elif afrom.column > left and ato.column < right:
-                    line += '-' + arrow_line
-                else:
-                    line += '|' + arrow_blank
-            line += '|'
-            if not message.bydirectional:
-                to_replace = '<' if (message.sender.column < message.receiver.column) else '>'
-                line = line.replace(to_replace, '-')
-            line += ' '
-            if message.data:
-                line += message.title + ' ' + json.dumps(message.data, indent=4)
+    def set_actors_data(self, actors_data: Mapping[str, dict[str, str]]) -> list[str]:
+        """
+        Sets the data of many actors. The data is not copied, so a profile created with `actor_profile`
+        can be applied to many plots, sharing the same read-only data.
+
+        Args:
+            actors_data (Mapping[str, dict[str, str]]): The data of each actor, by actor name.
+
+        Returns:
+            list[str]: The names that are not actors of the plot.
+        """
+        actors_by_name = self.actors_by_name
+        missing = []
+        for name, data in actors_data.items():
+            actor = actors_by_name.get(name)
+            if actor is None:
+                missing.append(name)
             else:
-                line += message.title + ' ' + message.content
-            line = line.replace('\n', '\n' + empty_line + ' ')
-            lines.append(line)
-            lines.append(empty_line)
-        return '\n'.join(lines)
+                actor.data = data
+        return missing
+
+    def export(self, writer: TextIO = None) -> str | None:
+        """
+        Renders the plot as a sequence diagram.
+
+        Args:
+            writer (TextIO, optional): If given, the diagram is written into it line by line instead of being returned.
 
-@dataclass
+        Returns:
+            str | None: The diagram, or None if a writer was given.
+        """
+        exporter = PlotExporter(self.actors)
+        if writer is None:
+            return exporter.export(self.messages)
+        exporter.write(self.messages, writer)
+        return None
+
+@dataclass(slots=True)
 class Actor:
     """
     Represents an actor in a plot
@@ -129,30 +237,193 @@ class Actor:
     def __str__(self):
         return f'{self.name}({self.column})'
 
-@dataclass
+def actor_profile(actors_data: Mapping[str, dict[str, str]]) -> Mapping[str, Mapping[str, str]]:
+    """
+    Creates a read-only actor data profile, to apply the same data to many plots with `Plot.set_actors_data`.
+    The data of each actor is copied once here, and then shared by every plot it is applied to.
+
+    Args:
+        actors_data (Mapping[str, dict[str, str]]): The data of each actor, by actor name.
+
+    Returns:
+        Mapping[str, Mapping[str, str]]: The read-only profile.
+    """
+    return MappingProxyType({
+        name: MappingProxyType(dict(data)) if isinstance(data, Mapping) else data
+        for name, data in actors_data.items()
+    })
+
+def decode_json_data(json_raw: str, line: int, char_number: int = 0) -> dict:
+    """
+    Decodes the JSON data of a message, with orjson when it is installed.
+
+    Args:
+        json_raw (str): The JSON text.
+        line (int): The line number of the message, for error messages.
+        char_number (int, optional): The position of the JSON text in the message content. Defaults to 0.
+
+    Raises:
+        PlotError: If the JSON data is invalid.
+
+    Returns:
+        dict: The decoded data.
+    """
+    if orjson is not None and not REGEX_BIG_INTEGER.search(json_raw):
+        try:
+            return orjson.loads(json_raw)
+        except orjson.JSONDecodeError:
+            # orjson is stricter than json, e.g. on NaN, let json decide.
+            pass
+    try:
+        return json.loads(json_raw)
+    except json.JSONDecodeError as e:
+        raise PlotError(f"invalid json data for message line line {line}: \n {e.msg}", char_number=char_number, line=json_raw)
+
+def continuation_data(line: str, nb_actors: int) -> str | None:
+    """
+    Gets the content a continuation line adds to its message.
+
+    Args:
+        line (str): The continuation line.
+        nb_actors (int): The number of actors, that is of columns before the content.
+
+    Returns:
+        str | None: The content of the line, or None if it is blank or a comment.
+    """
+    # The content starts after the last column.
+    columns = line.split('|', nb_actors)
+    data = columns[nb_actors] if len(columns) > nb_actors else ''
+    if data and data[0] == ' ':
+        data = data[1:]
+    if not data or data[0] == '#':
+        return None
+    return data
+
+def json_span(content: str) -> tuple[int, int]:
+    """
+    Finds the JSON data in the content of a message, from its first `{` to the matching `}`.
+    Strings and braces are found by a regex, so the content is scanned once.
+
+    Args:
+        content (str): The content of the message, holding a `{`.
+
+    Raises:
+        PlotError: If the JSON data has no end.
+
+    Returns:
+        tuple[int, int]: The start and end of the JSON data.
+    """
+    json_start = content.find('{')
+    depth = 0
+    for token in REGEX_JSON_TOKENS.finditer(content, json_start):
+        if token.group() == '{':
+            depth += 1
+        elif token.group() == '}':
+            depth -= 1
+            if depth == 0:
+                return json_start, token.end()
+    raise PlotError("invalid json data, no ending }", char_number=len(content), line=content)
+
+class BufferText:
+    """
+    The content of a message kept as a span of a buffer, such as a memory-mapped plot file, and only decoded when needed.
+    The span covers the lines of the message, from the start of its content on the arrow line to the end of its last line.
+    Decoding it applies the same rules as the parser to the continuation lines.
+
+    Attributes:
+        buffer (mmap.mmap | bytes): The buffer holding the message.
+        start (int): The start of the content in the buffer.
+        end (int): The end of the last line of the message in the buffer.
+        nb_actors (int): The number of actors of the plot, that is of columns before the content of continuation lines.
+    """
+
+    __slots__ = ('buffer', 'start', 'end', 'nb_actors')
+
+    def __init__(self, buffer, start: int, end: int, nb_actors: int):
+        self.buffer = buffer
+        self.start = start
+        self.end = end
+        self.nb_actors = nb_actors
+
+    def __str__(self):
+        lines = self.buffer[self.start:self.end].decode().split('\n')
+        content = [lines[0].rstrip('\r')]
+        for line in lines[1:]:
+            line = line.rstrip('\r')
+            # Lines looking like arrows inside a message have no message, they are ignored.
+            if is_arrow_line(line):
+                continue
+            data = continuation_data(line, self.nb_actors)
+            if data is not None:
+                content.append(data)
+        return '\n'.join(content)
+
 class Message:
     """
     Represents a message between two actors.
+    Messages use slots and interned titles to stay small on plots with millions of messages.
 
     Attributes:
         sender (str): The sender of the message.
         receiver (str): The receiver of the message.
         bydirectional (bool): Indicates if the message is bidirectional.
-        content (str): The content of the message.
+        content (str): The content of the message. It may be held as a BufferText, decoded on first access.
         line (int): The line number of the message.
         order (int, optional): The order of the message. Defaults to 0.
         title (str, optional): The title of the message. Defaults to None.
         data (dict[str, str], optional): Additional data associated with the message. Defaults to None.
+        raw_data (str | BufferText, optional): The JSON text of the data, or the whole content held in a buffer, when it was not decoded yet.
+            It is decoded on first access to `data`. Defaults to None.
     """
 
-    sender: Actor
-    receiver: Actor
-    bydirectional: bool
-    content: str
-    line: int
-    order: int = 0
-    title: str = None
-    data: dict[str, str] = None
+    __slots__ = ('sender', 'receiver', 'bydirectional', '_content', 'line', 'order', 'title', '_data', 'raw_data')
+
+    def __init__(self, sender: Actor, receiver: Actor, bydirectional: bool, content: str, line: int,
+                 order: int = 0, title: str = None, data: dict[str, str] = None, raw_data: str = None):
+        self.sender = sender
+        self.receiver = receiver
+        self.bydirectional = bydirectional
+        self.content = content
+        self.line = line
+        self.order = order
+        self.title = title
+        self._data = data
+        self.raw_data = raw_data
+
+    @property
+    def content(self) -> str:
+        if isinstance(self._content, BufferText):
+            self._content = str(self._content)
+        return self._content
+
+    @content.setter
+    def content(self, content: str | BufferText):
+        self._content = content
+
+    @property
+    def data(self) -> dict[str, str]:
+        if self.raw_data is not None:
+            json_raw = self.raw_data
+            if isinstance(json_raw, BufferText):
+                content = str(json_raw)
+                json_start, json_end = json_span(content)
+                json_raw = content[json_start:json_end]
+            self._data = decode_json_data(json_raw, self.line)
+            self.raw_data = None
+        return self._data
+
+    @data.setter
+    def data(self, data: dict[str, str]):
+        self._data = data
+        self.raw_data = None
+
+    def __eq__(self, other):
+        if not isinstance(other, Message):
+            return NotImplemented
+        return (self.sender, self.receiver, self.bydirectional, self.content, self.line, self.order, self.title, self.data) == \
+            (other.sender, other.receiver, other.bydirectional, other.content, other.line, other.order, other.title, other.data)
+
+    __hash__ = None
 
     def __str__(self):
         direction = '<->' if self.bydirectional else '-->'
@@ -165,18 +436,29 @@ class PlotParser:
     """
     A class that parses data from a file and constructs a plot object.
 
+    The source is read line by line, so a plot can be parsed from a path, an open
+    file or any iterable of lines without holding the whole file in memory.
+
     Attributes:
-        filename (str): The path of the file to be parsed.
+        filename (str): The path of the file to be parsed, or a name describing the stream.
+        source (str | TextIO | Iterable[str]): Where the lines are read from.
         plot (Plot): The plot object to be constructed.
-        data (List[str]): The data read from the file.
+        lazy (bool): If True, the JSON data of the messages is only decoded when it is accessed.
+        keep_content (bool): If False, the raw content of messages carrying JSON data is dropped once the data is extracted.
+        use_mmap (bool): If True, a plot file is memory-mapped and message contents are kept as byte ranges until accessed.
+        profiler (Profiler): If set, the time spent extracting the JSON data of messages is recorded in it.
 
     Methods:
-        __init__(self, filename: str, plot: Plot):
+        __init__(self, source: str | TextIO | Iterable[str], plot: Plot, lazy: bool = False, keep_content: bool = True, use_mmap: bool = False):
             Initializes the PlotParser object.
         parse(self) -> Plot:
             Parses the data in the file and constructs a plot object.
-        parse_line(self, line: str, line_no: int):
-            Parses a single line and adds its message to the plot.
+        stream(self) -> Iterator[Message]:
+            Parses the data lazily, yielding each message once it is complete.
+        parse_messages(self, lines: Iterable[str], first_line_no: int = 0, first_order: int = 0) -> Iterator[Message]:
+            Parses the lines following the actors, or a part of them.
+        parse_line(self, line: str, line_no: int) -> Message | None:
+            Parses a single line, returning the message it opens, if any.
         append_data_to_previous_message(self, line: str):
             Appends data to the previous message in the plot.
         get_column_counts(self, line: str) -> tuple[int, int, bool, bool, str, int]:
@@ -187,18 +469,49 @@ class PlotParser:
             Gets the sender, receiver, and direction of a message.
     """
 
-    def __init__(self, filename: str, plot: Plot):
+    def __init__(self, source: str | TextIO | Iterable[str], plot: Plot, lazy: bool = False, keep_content: bool = True, use_mmap: bool = False):
         """
         Initializes the PlotParser object.
+        Nothing is read until `parse` or `stream` is called.
 
         Args:
-            filename (str): The path of the file to be parsed.
+            source (str | TextIO | Iterable[str]): The path of the file to be parsed, an open file or an iterable of lines.
             plot (Plot): The plot object to be constructed.
+            lazy (bool, optional): If True, the JSON data of the messages is only decoded when it is accessed,
+                and invalid JSON is reported then. Defaults to False.
+            keep_content (bool, optional): If False, the raw content of messages carrying JSON data is dropped. Defaults to True.
+            use_mmap (bool, optional): If True and the source is a path, the file is memory-mapped and tokenized in place.
+                Message contents and JSON data are kept as byte ranges of the file and decoded when accessed, as if `lazy` was set.
+                Defaults to False.
         """
-        self.filename = filename
-        with open(filename, 'r') as file:
-            self.data = file.read().split("\n")
+        self.source = source
+        if isinstance(source, (str, os.PathLike)):
+            self.filename = os.fspath(source)
+        else:
+            self.filename = getattr(source, 'name', '<stream>')
         self.plot = plot
+        self.lazy = lazy
+        self.keep_content = keep_content
+        self.use_mmap = use_mmap and isinstance(source, (str, os.PathLike))
+        self.profiler = None
+        self.pending = None
+        self.pending_lines = None
+        self.order = 0
+
+    def read_lines(self) -> Iterator[str]:
+        """
+        Reads the source one line at a time.
+
+        Returns:
+            Iterator[str]: The lines of the source, without their line ending.
+        """
+        if isinstance(self.source, (str, os.PathLike)):
+            with open(self.source, 'r') as file:
+                for line in file:
+                    yield line.rstrip('\n')
+        else:
+            for line in self.source:
+                yield line.rstrip('\n')
 
     def parse(self) -> Plot:
         """
@@ -207,15 +520,57 @@ class PlotParser:
         Returns:
             Plot: The constructed plot object.
         """
+        self.plot.messages = []
+        for message in self.stream():
+            self.plot.messages.append(message)
+        return self.plot
+
+    def stream(self) -> Iterator[Message]:
+        """
+        Parses the data lazily and yields each message as soon as the next message closes it.
+        Messages are yielded with their title and JSON data extracted, but are not stored in the plot,
+        so memory is bounded by the largest single message.
+
+        Raises:
+            PlotError: If a line or a message payload is invalid.
+
+        Returns:
+            Iterator[Message]: The messages of the plot, in order.
+        """
+        if self.use_mmap:
+            with open(self.source, 'rb') as file:
+                if os.fstat(file.fileno()).st_size:
+                    buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                    yield from self.stream_buffer(buffer)
+                    return
+        lines = self.read_lines()
         # Parse the actors. They are the first line of the file, speparated by multiple spaces.
-        actors = self.data[0].split(" ")
-        regex_actors = re.compile(r"[A-Za-z0-9_-]+")
-        actors = regex_actors.findall(self.data[0])
-        self.plot.actors = [Actor(actor, index) for index, actor in enumerate(actors)]
+        header = next(lines, '')
+        actors = REGEX_ACTORS.findall(header)
+        self.plot.set_actors([Actor(actor, index) for index, actor in enumerate(actors)])
         # Parse the messages. They are the rest of the file.
-        for line_no, line in enumerate(self.data[1:]):
+        yield from self.parse_messages(lines)
+
+    def parse_messages(self, lines: Iterable[str], first_line_no: int = 0, first_order: int = 0) -> Iterator[Message]:
+        """
+        Parses the lines following the actors, or a part of them, with the actors already parsed.
+
+        Args:
+            lines (Iterable[str]): The lines to parse.
+            first_line_no (int, optional): The index of the first line, among the lines following the actors. Defaults to 0.
+            first_order (int, optional): The order of the first message. Defaults to 0.
+
+        Raises:
+            PlotError: If a line or a message payload is invalid.
+
+        Returns:
+            Iterator[Message]: The messages of the lines, in order.
+        """
+        self.pending = None
+        self.order = first_order
+        for line_no, line in enumerate(lines, first_line_no):
             try:
-                self.parse_line(line, line_no)
+                message = self.parse_line(line, line_no)
             except PlotError as e:
                 print(f"Error parsing file {self.filename}, line {line_no + 2}")
                 print(e.details)
@@ -224,10 +579,169 @@ class PlotParser:
                 print(f"Error parsing file {self.filename} : {line_no + 2}")
                 print(f"Invalid syntax:\n\t`{line}`")
                 raise e
+            if message is None:
+                continue
+            if self.pending is not None:
+                yield self.close_pending()
+            self.pending = message
+            self.pending_lines = [message.content]
+        if self.pending is not None:
+            yield self.close_pending()
+
+    def close_pending(self) -> Message:
+        """
+        Completes the pending message: joins its lines and extracts its title and JSON data.
+
+        Raises:
+            PlotError: If the JSON data is invalid.
 
-        for message in self.plot.messages:
+        Returns:
+            Message: The completed message.
+        """
+        message, self.pending = self.pending, None
+        message.content = '\n'.join(self.pending_lines)
+        self.pending_lines = None
+        if self.profiler is None:
             self.extract_json_data(message)
-        return self.plot
+            return message
+        started = time.perf_counter()
+        self.extract_json_data(message)
+        self.profiler.record_phase('parse.extract_json', time.perf_counter() - started)
+        return message
+
+    def stream_buffer(self, buffer) -> Iterator[Message]:
+        """
+        Parses a buffer, such as a memory-mapped file, without copying its lines.
+        Only the columns of arrow lines and the titles are decoded, the contents are kept as spans of the buffer.
+
+        Args:
+            buffer (mmap.mmap | bytes): The content of the plot file.
+
+        Raises:
+            PlotError: If a line is invalid.
+
+        Returns:
+            Iterator[Message]: The messages of the plot, in order.
+        """
+        lines = self.read_buffer_lines(buffer)
+        start, end = next(lines, (0, 0))
+        actors = REGEX_ACTORS.findall(buffer[start:end].decode())
+        self.plot.set_actors([Actor(actor, index) for index, actor in enumerate(actors)])
+        self.pending = None
+        self.order = 0
+        # The start of the pending message content, the end of its first line and the end of its last line.
+        content_start = first_line_end = content_end = 0
+        for line_no, (start, end) in enumerate(lines):
+            try:
+                opened = self.parse_buffer_line(buffer, start, end, line_no)
+            except PlotError as e:
+                print(f"Error parsing file {self.filename}, line {line_no + 2}")
+                print(e.details)
+                raise e
+            except Exception as e:
+                print(f"Error parsing file {self.filename} : {line_no + 2}")
+                print(f"Invalid syntax:\n\t`{buffer[start:end].decode(errors='replace')}`")
+                raise e
+            if opened is None:
+                content_end = end
+                continue
+            if self.pending is not None:
+                self.extract_buffer_data(self.pending, buffer, content_start, first_line_end, content_end)
+                yield self.pending
+            self.pending, content_start = opened
+            first_line_end = content_end = end
+        if self.pending is not None:
+            message, self.pending = self.pending, None
+            self.extract_buffer_data(message, buffer, content_start, first_line_end, content_end)
+            yield message
+
+    def read_buffer_lines(self, buffer) -> Iterator[tuple[int, int]]:
+        """
+        Splits a buffer into lines.
+
+        Args:
+            buffer (mmap.mmap | bytes): The content of the plot file.
+
+        Returns:
+            Iterator[tuple[int, int]]: The start and end of each line, without its line ending.
+        """
+        size = len(buffer)
+        start = 0
+        while start < size:
+            end = buffer.find(b'\n', start)
+            next_start = end + 1
+            if end == -1:
+                end = next_start = size
+            if end > start and buffer[end - 1] == 0x0d:
+                yield start, end - 1
+            else:
+                yield start, end
+            start = next_start
+
+    def parse_buffer_line(self, buffer, start: int, end: int, line_no: int) -> tuple[Message, int] | None:
+        """
+        Parses a single line of a buffer, like `parse_line`.
+        Continuation lines are only part of the span of the pending message, they are decoded with it.
+
+        Args:
+            buffer (mmap.mmap | bytes): The content of the plot file.
+            start (int): The start of the line.
+            end (int): The end of the line.
+            line_no (int): The line number.
+
+        Raises:
+            PlotError: If there is an error parsing the line.
+
+        Returns:
+            tuple[Message, int] | None: The message opened by this line, if any, and the position where its content starts.
+        """
+        is_arrow = False
+        if end > start and buffer[start] == 0x7c:
+            dash = buffer.find(b'-', start + 1, end)
+            is_arrow = dash != -1 and buffer.find(b'|', dash + 1, end) != -1
+        if self.pending is not None and not is_arrow:
+            return None
+        columns_end = REGEX_COLUMNS_BYTES.match(buffer, start, end).end()
+        columns = buffer[start:columns_end].decode('ascii')
+        try:
+            nb_columns_befor_message, nb_columns_after_message, message_found, arrow_ended, message_direction, end_of_columns = self.get_column_counts(columns)
+        except PlotError as e:
+            e.line = buffer[start:end].decode(errors='replace')
+            raise e
+        if not message_found:
+            return None
+        if nb_columns_after_message == 0 or columns_end == end:
+            raise PlotError("no message content. If you want no operation, use `#` to indicate it wasn't a mistake.", char_number=end_of_columns, line=buffer[start:end].decode(errors='replace'))
+        sender, receiver, bydirectional = self.get_sender_receiver_direction(nb_columns_befor_message, nb_columns_after_message, message_direction)
+        message = Message(sender=sender, receiver=receiver, bydirectional=bydirectional, content=None, order=self.order, line=line_no+2)
+        self.order += 1
+        return message, columns_end
+
+    def extract_buffer_data(self, message: Message, buffer, content_start: int, first_line_end: int, content_end: int):
+        """
+        Extracts the title of a message held in a buffer, like `extract_json_data`.
+        When the JSON data starts on the arrow line, only the title is decoded, the content and the data are kept in the buffer.
+        Otherwise, the content is decoded and extracted like any other message.
+
+        Args:
+            message (Message): The message to update.
+            buffer (mmap.mmap | bytes): The content of the plot file.
+            content_start (int): The start of the content on the arrow line.
+            first_line_end (int): The end of the arrow line.
+            content_end (int): The end of the last line of the message.
+
+        Raises:
+            PlotError: If the JSON data is invalid, when the content is decoded.
+        """
+        content = BufferText(buffer, content_start, content_end, len(self.plot.actors))
+        json_start = buffer.find(b'{', content_start, first_line_end)
+        if json_start == -1:
+            message.content = str(content)
+            self.extract_json_data(message)
+            return
+        message.title = sys.intern(buffer[content_start:json_start].decode().strip())
+        message.raw_data = content
+        message.content = content if self.keep_content else ''
 
     def extract_json_data(self, message: Message):
         """
@@ -245,24 +759,25 @@ class PlotParser:
         # extract the json data from the message content, if any
         if '{' not in message.content:
             title = message.content.strip().split(' ')[0] if ' ' in message.content else message.content
-            message.title = title
+            message.title = sys.intern(title)
             message.content = message.content.strip()[len(title):].strip()
             message.data = {}
             return
-        if '}' not in message.content:
-            raise PlotError("invalid json data, no ending }", char_number=len(message.content), line=message.content)
-        json_start = message.content.find('{')
-        json_end = message.content.find('}')
-        json_raw = message.content[json_start:json_end + 3]
-        try:
-            message.data = json.loads(json_raw)
-        except json.JSONDecodeError as e:
-            raise PlotError(f"invalid json data for message line line {message.line}: \n {e.msg}", char_number=json_start, line=json_raw)
-        message.title = message.content[:json_start].strip()
+        json_start, json_end = json_span(message.content)
+        json_raw = message.content[json_start:json_end]
+        if self.lazy:
+            message.raw_data = json_raw
+        else:
+            message.data = decode_json_data(json_raw, message.line, json_start)
+        message.title = sys.intern(message.content[:json_start].strip())
+        if not self.keep_content:
+            message.content = ''
+
 
-    def parse_line(self, line: str, line_no: int):
+    def parse_line(self, line: str, line_no: int) -> Message | None:
         """
-        Parses a single line and adds its message to the plot.
+        Parses a single line.
+        Continuation lines are appended to the lines of the pending message.
 
         Args:
             line (str): The line to be parsed.
@@ -270,44 +785,35 @@ class PlotParser:
 
         Raises:
             PlotError: If there is an error parsing the line.
+
+        Returns:
+            Message | None: The message opened by this line, if any.
         """
-        regex_line_is_new_message = re.compile(r"\|.*-.*\|.*")
-        if not re.match(regex_line_is_new_message, line) and self.plot.messages:
+        if self.pending is not None and not is_arrow_line(line):
             self.append_data_to_previous_message(line)
-            return
+            return None
         nb_columns_befor_message, nb_columns_after_message, message_found, arrow_ended, message_direction, end_of_columns = self.get_column_counts(line)
         if not message_found:
-            return
+            return None
         data = self.extract_data(line, end_of_columns, nb_columns_after_message)
         if not data:
             raise PlotError("no message content. If you want no operation, use `#` to indicate it wasn't a mistake.", char_number=end_of_columns, line=line)
         sender, receiver, bydirectional = self.get_sender_receiver_direction(nb_columns_befor_message, nb_columns_after_message, message_direction)
-        order = len(self.plot.messages)
-        message = Message(sender=sender, receiver=receiver, bydirectional=bydirectional, content=data, order=order, line=line_no+2)
-        self.plot.messages.append(message)
+        message = Message(sender=sender, receiver=receiver, bydirectional=bydirectional, content=data, order=self.order, line=line_no+2)
+        self.order += 1
+        return message
 
     def append_data_to_previous_message(self, line: str):
         """
-        Appends data to the previous message in the plot.
+        Appends data to the previous message in the plot, which is still pending.
 
         Args:
             line (str): The line containing the data to be appended.
         """
-        cnt = 0
-        i = 0
-        for i, char in enumerate(line):
-            if char == '|':
-                cnt += 1
-            if cnt == len(self.plot.actors):
-                break
-        data = line[i + 1:]
-        if data and data[0] == ' ':
-            data = data[1:]
-        if data and data[0] == '#':
+        data = continuation_data(line, len(self.plot.actors))
+        if data is None:
             return
-        if not data:
-            return
-        self.plot.messages[-1].content += '\n' + data
+        self.pending_lines.append(data)
 
     def get_column_counts(self, line: str) -> tuple[int, int, bool, bool, str, int]:
         """
@@ -325,32 +831,21 @@ class PlotParser:
                 - The direction of the message.
                 - The index of the end of the columns.
         """
-        nb_columns_befor_message = -1
-        nb_columns_after_message = 0
-        message_found = False
-        arrow_ended = False
-        message_direction = ''
-        end_of_columns = -1
-        for i, char in enumerate(line):
-            if message_found and char == '|':
-                nb_columns_after_message += 1
-            elif char == '|':
-                nb_columns_befor_message += 1
-            elif char == '-':
-                if arrow_ended:
-                    raise PlotError("multiple arrows in the same line", char_number=i, line=line)
-                message_found = True
-            elif char == '>':
-                message_direction += '>'
-            elif char == '<':
-                message_direction += '<'
-            elif char not in '\t -|<>':
-                end_of_columns = i - 1
-                break
-            if message_found and char != '-':
-                arrow_ended = True
-        else:
-            end_of_columns = len(line) - 1
+        end = REGEX_COLUMNS.match(line).end()
+        columns = line[:end]
+        end_of_columns = end - 1
+        message_direction = columns.translate(ARROW_HEADS)
+        arrow = REGEX_ARROW.search(columns)
+        if arrow is None:
+            return columns.count('|') - 1, 0, False, False, message_direction, end_of_columns
+        arrow_start, arrow_end = arrow.span()
+        second_arrow = columns.find('-', arrow_end)
+        if second_arrow != -1:
+            raise PlotError("multiple arrows in the same line", char_number=second_arrow, line=line)
+        nb_columns_befor_message = columns.count('|', 0, arrow_start) - 1
+        nb_columns_after_message = columns.count('|', arrow_end)
+        message_found = True
+        arrow_ended = arrow_end < end
         return nb_columns_befor_message, nb_columns_after_message, message_found, arrow_ended, message_direction, end_of_columns
 
 
@@ -0,0 +1,604 @@
+# This file contains the replay driver, sending the rendered messages of an actor to the other actors over TCP.
+
+from dataclasses import dataclass, field
+from typing import Callable
+import math
+import socket
+import threading
+import time
+from .pyplot import Actor, Plot
+from .action import ActionRegistry, prepare_play
+
+@dataclass
+class ReplayStep:
+    """
+    A rendered message of the replayed actor.
+
+    Attributes:
+        order (int): The order of the message in the plot.
+        peer (str): The name of the other actor of the message.
+        send (bool): True if the replayed actor sends the message, False if it receives it.
+        payload (bytes): The rendered message.
+    """
+
+    order: int
+    peer: str
+    send: bool
+    payload: bytes
+
+def replay_steps(plot: Plot, actor: str, registry: ActionRegistry = None) -> list[ReplayStep]:
+    """
+    Renders the messages sent and received by an actor, once, with the registered actions.
+    Messages between other actors, and messages rendering nothing, are left out.
+    A plot not parsed yet is parsed, as streaming it again would replace its actors and the addresses set in their data.
+
+    Args:
+        plot (Plot): The plot.
+        actor (str): The name of the replayed actor.
+        registry (ActionRegistry, optional): The registry of the actions. Defaults to `default_registry`.
+
+    Returns:
+        list[ReplayStep]: The steps of the actor, in order.
+    """
+    if not plot.parsed:
+        plot.parse()
+    dispatcher = prepare_play(registry)
+    steps = []
+    for message in plot.iter_messages():
+        sender = message.sender.name
+        receiver = message.receiver.name
+        if sender == receiver or actor not in (sender, receiver):
+            continue
+        payload = ''.join(dispatcher.run(plot, message)).encode()
+        if not payload:
+            continue
+        send = sender == actor
+        steps.append(ReplayStep(message.order, receiver if send else sender, send, payload))
+    return steps
+
+def actor_address(actor: Actor) -> tuple[str, int]:
+    """
+    Gets the TCP address of an actor, from the "host" and "port" keys of its data, or from an "address" key as "host:port".
+
+    Args:
+        actor (Actor): The actor.
+
+    Raises:
+        ValueError: If the data of the actor has no address.
+
+    Returns:
+        tuple[str, int]: The host and port.
+    """
+    data = actor.data or {}
+    if 'address' in data:
+        host, _, port = str(data['address']).rpartition(':')
+        return host, int(port)
+    if 'port' in data:
+        return data.get('host', '127.0.0.1'), int(data['port'])
+    raise ValueError(f"actor {actor.name} has no address, set its data to {{'host': ..., 'port': ...}}")
+
+def recv_exactly(connection: socket.socket, size: int) -> bytes:
+    """
+    Receives a given number of bytes, or less if the connection is closed before.
+    """
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        chunk = connection.recv(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+class ResponseReader:
+    """
+    Reads the responses received on a connection, keeping the bytes received after a response for the next one.
+
+    Attributes:
+        connection (socket.socket): The connection.
+        buffer (bytearray): The bytes received and not read yet.
+        received_at (float): When bytes were last received, as given by `time.perf_counter`.
+
+    Methods:
+        read_exactly(self, size: int) -> bytes: Reads a given number of bytes.
+        read_until(self, delimiter: bytes) -> bytes: Reads up to and including a delimiter.
+        read_until_idle(self, idle: float) -> bytes: Reads until nothing is received for a while.
+    """
+
+    # The largest response searched for a delimiter.
+    MAX_SIZE = 1 << 24
+
+    def __init__(self, connection: socket.socket):
+        self.connection = connection
+        self.buffer = bytearray()
+        self.received_at = None
+
+    def receive(self, size: int = 65536):
+        chunk = self.connection.recv(size)
+        if not chunk:
+            raise ConnectionError(f"connection closed with {len(self.buffer)} byte(s) of a response received")
+        self.buffer += chunk
+        self.received_at = time.perf_counter()
+
+    def take(self, size: int) -> bytes:
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+    def read_exactly(self, size: int) -> bytes:
+        """
+        Reads a given number of bytes. Nothing is received past them.
+
+        Raises:
+            ConnectionError: If the connection is closed before.
+        """
+        while len(self.buffer) < size:
+            self.receive(size - len(self.buffer))
+        return self.take(size)
+
+    def read_until(self, delimiter: bytes) -> bytes:
+        """
+        Reads up to and including the first occurrence of a delimiter.
+
+        Raises:
+            ConnectionError: If the connection is closed before, or if no delimiter is found in `MAX_SIZE` bytes.
+        """
+        start = 0
+        while True:
+            end = self.buffer.find(delimiter, start)
+            if end != -1:
+                return self.take(end + len(delimiter))
+            if len(self.buffer) > self.MAX_SIZE:
+                raise ConnectionError(f"no {delimiter!r} in the first {len(self.buffer)} bytes of a response")
+            start = max(len(self.buffer) - len(delimiter) + 1, 0)
+            self.receive()
+
+    def read_until_idle(self, idle: float) -> bytes:
+        """
+        Waits for a response, then reads until nothing is received for `idle` seconds.
+
+        Raises:
+            ConnectionError: If the connection is closed before the response starts.
+        """
+        if not self.buffer:
+            self.receive()
+        timeout = self.connection.gettimeout()
+        self.connection.settimeout(idle)
+        try:
+            while True:
+                self.receive()
+        except (socket.timeout, ConnectionError):
+            pass
+        finally:
+            self.connection.settimeout(timeout)
+        return self.take(len(self.buffer))
+
+# A framing reads one response from a reader, given the rendered message it is compared with.
+Framing = Callable[[ResponseReader, bytes], bytes]
+
+def frame_by_length(reader: ResponseReader, expected: bytes) -> bytes:
+    """
+    Reads as many bytes as the rendered message. Only for servers answering exactly the rendered messages,
+    such as `StandInServer`: a longer response is read as the start of the next one.
+    """
+    return reader.read_exactly(len(expected))
+
+def frame_by_delimiter(delimiter: bytes = b'\n') -> Framing:
+    """
+    Gets the framing of protocols whose messages end with a delimiter they do not contain otherwise.
+
+    Args:
+        delimiter (bytes, optional): The end of a message. Defaults to b'\n'.
+
+    Returns:
+        Framing: The framing.
+    """
+    def framing(reader: ResponseReader, expected: bytes) -> bytes:
+        return reader.read_until(delimiter)
+    return framing
+
+def frame_until_idle(idle: float = 0.05) -> Framing:
+    """
+    Gets the framing of servers whose responses are followed by a pause: a response is what is received until the server is idle.
+    It works with any protocol, but each response costs `idle` seconds, and consecutive responses sent at once are read as one.
+    The latency is still measured to the last byte of the response.
+
+    Args:
+        idle (float, optional): The pause ending a response, in seconds. Defaults to 0.05.
+
+    Returns:
+        Framing: The framing.
+    """
+    def framing(reader: ResponseReader, expected: bytes) -> bytes:
+        return reader.read_until_idle(idle)
+    return framing
+
+def frame_http(reader: ResponseReader, expected: bytes) -> bytes:
+    """
+    Reads an HTTP/1.x response: its headers, then a body of `Content-Length` bytes or a chunked body.
+    Lines may end with CRLF or LF, as in rendered templates. A response with neither header has no body.
+    """
+    head = bytearray()
+    while True:
+        line = reader.read_until(b'\n')
+        head += line
+        if line in (b'\r\n', b'\n'):
+            break
+    chunked = False
+    length = 0
+    for header in bytes(head).split(b'\n')[1:]:
+        name, _, value = header.partition(b':')
+        name = name.strip().lower()
+        if name == b'content-length':
+            length = int(value.strip())
+        elif name == b'transfer-encoding' and b'chunked' in value.lower():
+            chunked = True
+    if not chunked:
+        return bytes(head) + reader.read_exactly(length)
+    body = bytearray()
+    while True:
+        size_line = reader.read_until(b'\n')
+        body += size_line
+        size = int(size_line.split(b';')[0].strip(), 16)
+        if size == 0:
+            break
+        body += reader.read_exactly(size)
+        body += reader.read_until(b'\n')
+    # The trailers end with an empty line.
+    while True:
+        line = reader.read_until(b'\n')
+        body += line
+        if line in (b'\r\n', b'\n'):
+            break
+    return bytes(head) + bytes(body)
+
+class ConnectionPool:
+    """
+    Idle TCP connections, by address, reused by the next replays instead of connecting again.
+
+    Attributes:
+        timeout (float): The timeout of the connections, in seconds.
+        size (int): The maximum number of idle connections kept per address, or None for no limit.
+        idle (dict[tuple[str, int], list[socket.socket]]): The idle connections, by address.
+
+    Methods:
+        acquire(self, address) -> socket.socket: Gets an idle connection, or opens a new one.
+        release(self, address, connection): Gives a connection back to the pool.
+        close(self): Closes the idle connections.
+    """
+
+    def __init__(self, timeout: float = 5.0, size: int = None):
+        self.timeout = timeout
+        self.size = size
+        self.idle = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, address: tuple[str, int]) -> socket.socket:
+        with self.lock:
+            idle = self.idle.get(address)
+            if idle:
+                return idle.pop()
+        connection = socket.create_connection(address, timeout=self.timeout)
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return connection
+
+    def release(self, address: tuple[str, int], connection: socket.socket):
+        with self.lock:
+            idle = self.idle.setdefault(address, [])
+            if self.size is None or len(idle) < self.size:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self.lock:
+            for idle in self.idle.values():
+                for connection in idle:
+                    connection.close()
+            self.idle.clear()
+
+@dataclass
+class ReplayReport:
+    """
+    The statistics of a replay.
+
+    Attributes:
+        iterations (int): The number of times the plot was replayed.
+        requests (int): The number of messages sent.
+        responses (int): The number of messages received.
+        mismatches (int): The number of messages received that differ from the rendered message.
+        errors (int): The number of replays stopped by a connection error.
+        duration (float): The duration of the replay, in seconds.
+        latencies (list[float]): The time between each request and its response, in seconds.
+        failures (list[str]): The descriptions of the first mismatches and errors.
+
+    Methods:
+        percentile(self, percent: float) -> float: Gets a latency percentile.
+        report(self) -> dict: Gets the statistics as plain data.
+        summary(self) -> str: Gets the statistics as text.
+    """
+
+    iterations: int = 0
+    requests: int = 0
+    responses: int = 0
+    mismatches: int = 0
+    errors: int = 0
+    duration: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+    failures: list[str] = field(default_factory=list)
+
+    # Only the first failures are described, a long load test would otherwise keep them all.
+    MAX_FAILURES = 100
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.requests / self.duration if self.duration else 0.0
+
+    def add_failure(self, description: str):
+        if len(self.failures) < self.MAX_FAILURES:
+            self.failures.append(description)
+
+    def merge(self, other: 'ReplayReport'):
+        self.requests += other.requests
+        self.responses += other.responses
+        self.mismatches += other.mismatches
+        self.errors += other.errors
+        self.latencies += other.latencies
+        for failure in other.failures:
+            self.add_failure(failure)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Gets a latency percentile, by the nearest rank method.
+
+        Args:
+            percent (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The latency, in seconds, or 0 if no response was received.
+        """
+        if not self.latencies:
+            return 0.0
+        latencies = sorted(self.latencies)
+        return latencies[max(math.ceil(percent / 100 * len(latencies)) - 1, 0)]
+
+    def report(self) -> dict:
+        """
+        Gets the statistics as plain data, ready to be dumped as JSON.
+
+        Returns:
+            dict: The counts, throughput, latency percentiles in seconds, and failures.
+        """
+        return {
+            'iterations': self.iterations,
+            'requests': self.requests,
+            'responses': self.responses,
+            'mismatches': self.mismatches,
+            'errors': self.errors,
+            'duration': self.duration,
+            'requests_per_second': self.requests_per_second,
+            'latency': {name: self.percentile(percent) for name, percent in (('p50', 50), ('p90', 90), ('p99', 99), ('max', 100))},
+            'failures': list(self.failures),
+        }
+
+    def summary(self) -> str:
+        """
+        Gets the statistics as text, with the first failures.
+
+        Returns:
+            str: The statistics.
+        """
+        lines = [
+            f"{self.iterations} replay(s), {self.requests} request(s), {self.responses} response(s) in {self.duration:.3f} s: {self.requests_per_second:.1f} req/s",
+            f"latency p50 {self.percentile(50) * 1000:.2f} ms, p90 {self.percentile(90) * 1000:.2f} ms, "
+            f"p99 {self.percentile(99) * 1000:.2f} ms, max {self.percentile(100) * 1000:.2f} ms",
+            f"{self.mismatches} mismatch(es), {self.errors} error(s)",
+        ]
+        lines += self.failures[:10]
+        if self.mismatches + self.errors > 10:
+            lines.append(f"... {self.mismatches + self.errors - 10} more")
+        return '\n'.join(lines)
+
+def replay_once(steps: list[ReplayStep], addresses: dict[str, tuple[str, int]], pool: ConnectionPool, report: ReplayReport,
+                framing: Framing = frame_by_length):
+    """
+    Replays the steps of an actor once, over one connection per peer taken from the pool.
+    The latency of a response is measured from the first request sent to its peer since the previous response, to the last byte of the response.
+    A connection is only given back to the pool if all its responses matched and nothing was received after them.
+
+    Args:
+        steps (list[ReplayStep]): The steps of the replayed actor.
+        addresses (dict[str, tuple[str, int]]): The address of each peer.
+        pool (ConnectionPool): The pool of connections.
+        report (ReplayReport): The report the statistics are added to.
+        framing (Framing, optional): Reads a response, see `frame_until_idle`. Defaults to `frame_by_length`.
+    """
+    readers = {}
+    pending = {}
+    mismatched = set()
+    try:
+        for step in steps:
+            reader = readers.get(step.peer)
+            if reader is None:
+                reader = readers[step.peer] = ResponseReader(pool.acquire(addresses[step.peer]))
+            if step.send:
+                pending.setdefault(step.peer, time.perf_counter())
+                reader.connection.sendall(step.payload)
+                report.requests += 1
+                continue
+            received = framing(reader, step.payload)
+            started = pending.pop(step.peer, None)
+            if started is not None:
+                # The response may have been received with the previous one, before the request was sent.
+                report.latencies.append(max(reader.received_at - started, 0.0))
+            report.responses += 1
+            if received != step.payload:
+                report.mismatches += 1
+                report.add_failure(f"message {step.order} from {step.peer}: expected {step.payload!r}, received {received!r}")
+                mismatched.add(step.peer)
+    except (OSError, ValueError) as e:
+        report.errors += 1
+        report.add_failure(f"message {step.order} with {step.peer}: {type(e).__name__}: {e}")
+        for reader in readers.values():
+            reader.connection.close()
+        return
+    for peer, reader in readers.items():
+        if reader.buffer:
+            report.mismatches += 1
+            report.add_failure(f"{len(reader.buffer)} unexpected byte(s) from {peer}: {bytes(reader.buffer[:100])!r}")
+            mismatched.add(peer)
+        if peer in mismatched:
+            reader.connection.close()
+        else:
+            pool.release(addresses[peer], reader.connection)
+
+def replay(plot: Plot, actor: str, iterations: int = 1, concurrency: int = 1, timeout: float = 5.0, registry: ActionRegistry = None,
+           framing: Framing = None) -> ReplayReport:
+    """
+    Replays a plot as one of its actors: the messages it sends are rendered and sent over TCP to the address in the data
+    of their receiver, see `actor_address`, and the responses are compared with the rendered messages it receives.
+    Messages are rendered once, each replay only sends and receives them, over connections kept open between replays.
+
+    Args:
+        plot (Plot): The plot, with the addresses of the other actors set in their data.
+        actor (str): The name of the replayed actor.
+        iterations (int, optional): The number of times the plot is replayed. Defaults to 1.
+        concurrency (int, optional): The number of replays running at once, each in a thread. Defaults to 1.
+        timeout (float, optional): The timeout of the connections, in seconds. Defaults to 5.0.
+        registry (ActionRegistry, optional): The registry of the actions. Defaults to `default_registry`.
+        framing (Framing, optional): Reads a response: `frame_until_idle()`, `frame_http`, `frame_by_delimiter()`,
+            `frame_by_length` against stand-in servers, or a function of the protocol. Defaults to `frame_until_idle()`.
+
+    Raises:
+        ValueError: If an actor the replayed actor talks to has no address.
+
+    Returns:
+        ReplayReport: The statistics of the replay.
+    """
+    if framing is None:
+        framing = frame_until_idle()
+    steps = replay_steps(plot, actor, registry)
+    addresses = {peer: actor_address(plot.get_actor(peer)) for peer in {step.peer for step in steps}}
+    pool = ConnectionPool(timeout, size=concurrency)
+    report = ReplayReport(iterations=iterations)
+    started = time.perf_counter()
+    try:
+        if concurrency <= 1:
+            for _ in range(iterations):
+                replay_once(steps, addresses, pool, report, framing)
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            def worker(count: int) -> ReplayReport:
+                partial = ReplayReport()
+                for _ in range(count):
+                    replay_once(steps, addresses, pool, partial, framing)
+                return partial
+            counts = [iterations // concurrency + (index < iterations % concurrency) for index in range(concurrency)]
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                for partial in executor.map(worker, counts):
+                    report.merge(partial)
+    finally:
+        pool.close()
+    report.duration = time.perf_counter() - started
+    return report
+
+class StandInServer:
+    """
+    A local TCP server playing the other side of a replay, to test it without the real services.
+    On each connection, it waits for the messages the replayed actor sends to it and answers with the messages it sends back,
+    following the steps of the replay, again and again until the connection is closed.
+    Its messages are sent as rendered, without pauses, so replays against it use `frame_by_length`.
+
+    Attributes:
+        steps (list[ReplayStep]): The steps of the replayed actor with this server.
+        address (tuple[str, int]): The address the server listens on.
+        mismatches (int): The number of received messages that differ from the rendered message.
+
+    Methods:
+        start(self): Starts serving in a thread.
+        stop(self): Stops the server.
+    """
+
+    def __init__(self, steps: list[ReplayStep], host: str = '127.0.0.1', port: int = 0):
+        # Only needed for tests, not imported with the package.
+        import socketserver
+        self.steps = steps
+        self.mismatches = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                server.serve_connection(self.request)
+
+        self.server = socketserver.ThreadingTCPServer((host, port), Handler, bind_and_activate=False)
+        self.server.daemon_threads = True
+        self.server.allow_reuse_address = True
+        self.server.server_bind()
+        self.server.server_activate()
+        self.address = self.server.server_address[:2]
+        self.thread = None
+
+    def serve_connection(self, connection: socket.socket):
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            if not self.steps:
+                while connection.recv(4096):
+                    pass
+                return
+            # Once per replay on the connection. When the replayed actor only receives, the messages of the next replays
+            # are sent ahead, and wait in the connection until they are read.
+            while True:
+                for step in self.steps:
+                    if not step.send:
+                        connection.sendall(step.payload)
+                        continue
+                    received = recv_exactly(connection, len(step.payload))
+                    if len(received) < len(step.payload):
+                        return
+                    if received != step.payload:
+                        with self.lock:
+                            self.mismatches += 1
+        except OSError:
+            # The replay closed the connection.
+            return
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> 'StandInServer':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def stand_in_servers(plot: Plot, actor: str, registry: ActionRegistry = None) -> dict[str, StandInServer]:
+    """
+    Creates a stand-in server for each actor the replayed actor talks to, and sets their address in the data of these actors.
+    The servers are not started.
+
+    Args:
+        plot (Plot): The plot.
+        actor (str): The name of the replayed actor.
+        registry (ActionRegistry, optional): The registry of the actions. Defaults to `default_registry`.
+
+    Returns:
+        dict[str, StandInServer]: The servers, by actor name.
+    """
+    servers = {}
+    for peer in dict.fromkeys(step.peer for step in replay_steps(plot, actor, registry)):
+        server = servers[peer] = StandInServer([])
+        host, port = server.address
+        plot.set_actor_data(dict(plot.get_actor(peer).data or {}, host=host, port=port), peer)
+    # Rendered again, now that the templates can use the addresses.
+    steps = replay_steps(plot, actor, registry)
+    for peer, server in servers.items():
+        server.steps = [step for step in steps if step.peer == peer]
+    return servers
@@ -0,0 +1,163 @@
+# This file contains the scenarios, parsed once and played for many variants of the actor data.
+
+from typing import TYPE_CHECKING, Iterable, Iterator, Mapping
+from .pyplot import Actor, Message, Plot
+from .action import ActionRegistry, prepare_play
+from .matching import Match
+from .templates import render_many
+
+if TYPE_CHECKING:
+    from .cache import PlotCache
+
+class MessageView:
+    """
+    A message of a scenario, seen from a bound plot: the sender and receiver are the actors of the bound plot,
+    everything else is read from the shared message.
+
+    Attributes:
+        message (Message): The shared message.
+        sender (Actor): The sender, with the data of the bound plot.
+        receiver (Actor): The receiver, with the data of the bound plot.
+    """
+
+    __slots__ = ('message', 'sender', 'receiver')
+
+    def __init__(self, message: Message, sender: Actor, receiver: Actor):
+        self.message = message
+        self.sender = sender
+        self.receiver = receiver
+
+    def __getattr__(self, name):
+        return getattr(self.message, name)
+
+    def __str__(self):
+        return str(self.message)
+
+    def __repr__(self):
+        return repr(self.message)
+
+class BoundPlot(Plot):
+    """
+    A plot sharing the parsed messages of a scenario, with its own actors and actor data.
+    Its messages are views of the messages of the scenario, created when they are iterated.
+
+    Attributes:
+        scenario (Scenario): The scenario.
+
+    Methods:
+        view(self, message: Message) -> MessageView: Gets the view of a message of the scenario.
+    """
+
+    def __init__(self, scenario: 'Scenario', actors_data: Mapping[str, dict[str, str]] = None):
+        # The scenario is already parsed, the plot needs no parser.
+        self.title = scenario.title
+        self.filename = scenario.filename
+        self.scenario = scenario
+        self.set_actors([Actor(actor.name, actor.column) for actor in scenario.actors])
+        self.parsed = True
+        self.parser = None
+        if actors_data:
+            self.set_actors_data(actors_data)
+
+    @property
+    def messages(self) -> list[MessageView]:
+        return list(self.iter_messages())
+
+    def parse(self, cache=None, profiler=None):
+        pass
+
+    def iter_messages(self) -> Iterator[MessageView]:
+        return map(self.view, self.scenario.messages)
+
+    def view(self, message: Message) -> MessageView:
+        actors = self.actors
+        return MessageView(message, actors[message.sender.column], actors[message.receiver.column])
+
+class Scenario:
+    """
+    A plot parsed once, whose messages are shared by many bound plots, one per variant of the actor data.
+    The messages of a scenario must not be modified.
+
+    Attributes:
+        title (str): The title of the plot.
+        filename (str): The filename of the plot.
+        actors (tuple[Actor, ...]): The actors, without data.
+        messages (tuple[Message, ...]): The parsed messages.
+
+    Methods:
+        bind(self, actors_data) -> BoundPlot: Creates a plot with the given actor data.
+        play_variants(self, variants, registry) -> list[str]: Plays the scenario for many variants of the actor data.
+    """
+
+    def __init__(self, title: str, filename: str | Iterable[str], cache: 'PlotCache' = None, lazy: bool = False, use_mmap: bool = False):
+        """
+        Parses the plot of the scenario.
+
+        Args:
+            title (str): The title of the plot.
+            filename (str | Iterable[str]): The filename of the plot, or an open file / iterable of lines.
+            cache (PlotCache, optional): The cache of parsed plots. Defaults to None.
+            lazy (bool, optional): Decode the JSON data of a message on first access. Defaults to False.
+            use_mmap (bool, optional): Memory-map the file. Defaults to False.
+
+        Raises:
+            PlotError: If the plot is invalid.
+        """
+        plot = Plot(title, filename, lazy=lazy, use_mmap=use_mmap)
+        plot.parse(cache)
+        self.title = title
+        self.filename = filename
+        self.actors = tuple(plot.actors)
+        self.messages = tuple(plot.messages)
+
+    def bind(self, actors_data: Mapping[str, dict[str, str]] = None) -> BoundPlot:
+        """
+        Creates a plot sharing the messages of the scenario, with its own actor data.
+
+        Args:
+            actors_data (Mapping[str, dict[str, str]], optional): The data of each actor, by actor name, see `Plot.set_actors_data`.
+
+        Returns:
+            BoundPlot: The plot.
+        """
+        return BoundPlot(self, actors_data)
+
+    def play_variants(self, variants: Iterable[Mapping[str, dict[str, str]] | BoundPlot], registry: ActionRegistry = None) -> list[str]:
+        """
+        Plays the scenario for many variants of the actor data, in a single pass over the messages.
+        The actions of each message are looked up once, and matchers are checked once, for all the variants.
+        Each template renders the message for all the variants at once, other triggers and executes are called per variant.
+
+        Args:
+            variants (Iterable[Mapping[str, dict[str, str]] | BoundPlot]): The data of the actors of each variant, or bound plots.
+            registry (ActionRegistry, optional): The registry of the actions. Defaults to `default_registry`.
+
+        Returns:
+            list[str]: The result of playing each variant, as `play` would return it.
+        """
+        dispatcher = prepare_play(registry)
+        plots = [variant if isinstance(variant, BoundPlot) else self.bind(variant) for variant in variants]
+        outputs = [[] for _ in plots]
+        for message in self.messages:
+            candidates = dispatcher.lookup(message)
+            if not candidates:
+                continue
+            views = [plot.view(message) for plot in plots]
+            for action, check, execute in candidates:
+                if check is not None and isinstance(action.trigger, Match):
+                    # The data pattern of a matcher only reads the message data, shared by every variant.
+                    if not check(plots[0] if plots else None, message):
+                        continue
+                    check = None
+                template_name = dispatcher.template_names.get(action)
+                if check is None and template_name is not None:
+                    for output, res in zip(outputs, render_many(dispatcher.templates[template_name], views)):
+                        output.append(res + '\n')
+                    continue
+                for output, plot, view in zip(outputs, plots, views):
+                    if check is not None and not check(plot, view):
+                        continue
+                    res = execute(plot, view)
+                    if type(res) is str:
+                        output.append(res)
+        return [''.join(output) for output in outputs]
@@ -0,0 +1,166 @@
+# This file contains the template cache used by template actions.
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Iterable, Iterator
+import os
+import threading
+
+# jinja2 is only imported when a template is first loaded, parsing and exporting plots do not need it.
+if TYPE_CHECKING:
+    import jinja2
+
+class TemplateCache:
+    """
+    A long-lived cache of compiled jinja2 templates.
+    Templates are kept in a LRU cache and recompiled when their file changes on disk.
+    Compiled bytecode can also be persisted on disk, so a new process does not compile the templates again.
+    The cache can be used from several threads.
+
+    Attributes:
+        search_path (str | list[str]): The directories the templates are loaded from.
+        cache_size (int): The maximum number of compiled templates kept in memory.
+        bytecode_cache_dir (str): The directory where the compiled bytecode is stored, or None to disable it.
+        templates (OrderedDict[str, tuple[int, jinja2.Template]]): The cached templates with the mtime of their file.
+        generation (int): Incremented whenever the cache is configured or cleared, so the templates loaded before are known to be outdated.
+
+    Methods:
+        configure(self, search_path, cache_size, bytecode_cache_dir): Changes the settings and clears the cache.
+        get_template(self, name: str) -> jinja2.Template: Gets a compiled template.
+        clear(self): Empties the cache.
+    """
+
+    def __init__(self, search_path: str | list[str] = "./", cache_size: int = 400, bytecode_cache_dir: str = None):
+        self.templates = OrderedDict()
+        self.generation = 0
+        self.lock = threading.RLock()
+        self.configure(search_path, cache_size, bytecode_cache_dir)
+
+    def configure(self, search_path: str | list[str] = "./", cache_size: int = 400, bytecode_cache_dir: str = None):
+        """
+        Changes the settings of the cache and clears it.
+
+        Args:
+            search_path (str | list[str], optional): The directories the templates are loaded from. Defaults to "./".
+            cache_size (int, optional): The maximum number of compiled templates kept in memory. Defaults to 400.
+            bytecode_cache_dir (str, optional): The directory where the compiled bytecode is stored. Defaults to None.
+        """
+        with self.lock:
+            self.search_path = search_path
+            self.cache_size = cache_size
+            self.bytecode_cache_dir = bytecode_cache_dir
+            self.environment = None
+            self.clear()
+
+    def get_environment(self) -> 'jinja2.Environment':
+        """
+        Gets the jinja2 environment, creating it on first use.
+
+        Returns:
+            jinja2.Environment: The environment used to compile the templates.
+        """
+        if self.environment is None:
+            import jinja2
+            bytecode_cache = None
+            if self.bytecode_cache_dir is not None:
+                os.makedirs(self.bytecode_cache_dir, exist_ok=True)
+                bytecode_cache = jinja2.FileSystemBytecodeCache(self.bytecode_cache_dir)
+            # The environment keeps its own cache for the templates loaded by {% extends %}, {% include %} and {% import %}.
+            self.environment = jinja2.Environment(
+                loader=jinja2.FileSystemLoader(self.search_path),
+                bytecode_cache=bytecode_cache,
+                cache_size=self.cache_size,
+            )
+        return self.environment
+
+    def get_mtime(self, name: str) -> int | None:
+        """
+        Gets the modification time of a template file.
+
+        Args:
+            name (str): The name of the template.
+
+        Returns:
+            int | None: The modification time in nanoseconds, or None if the file was not found.
+        """
+        search_path = [self.search_path] if isinstance(self.search_path, (str, os.PathLike)) else self.search_path
+        for directory in search_path:
+            try:
+                return os.stat(os.path.join(directory, name)).st_mtime_ns
+            except OSError:
+                continue
+        return None
+
+    def get_template(self, name: str) -> 'jinja2.Template':
+        """
+        Gets a compiled template, compiling it only if it is not cached or if its file changed.
+
+        Args:
+            name (str): The name of the template.
+
+        Raises:
+            jinja2.TemplateNotFound: If the template does not exist.
+
+        Returns:
+            jinja2.Template: The compiled template.
+        """
+        mtime = self.get_mtime(name)
+        with self.lock:
+            entry = self.templates.get(name)
+            if entry is not None and entry[0] == mtime:
+                self.templates.move_to_end(name)
+                return entry[1]
+            template = self.get_environment().get_template(name)
+            self.templates[name] = (mtime, template)
+            self.templates.move_to_end(name)
+            while len(self.templates) > self.cache_size:
+                self.templates.popitem(last=False)
+            return template
+
+    def clear(self):
+        """
+        Empties the cache.
+        """
+        with self.lock:
+            self.templates.clear()
+            self.generation += 1
+
+template_cache = TemplateCache()
+
+def configure_templates(search_path: str | list[str] = "./", cache_size: int = 400, bytecode_cache_dir: str = None):
+    """
+    Configures the template cache used by template actions.
+
+    Args:
+        search_path (str | list[str], optional): The directories the templates are loaded from. Defaults to "./".
+        cache_size (int, optional): The maximum number of compiled templates kept in memory. Defaults to 400.
+        bytecode_cache_dir (str, optional): The directory where the compiled bytecode is stored. Defaults to None.
+    """
+    template_cache.configure(search_path, cache_size, bytecode_cache_dir)
+
+def render_many(template: 'jinja2.Template', messages: Iterable) -> Iterator[str]:
+    """
+    Renders a template once per message, like `template.render(message=message)`.
+    A single context is created and reset between messages, instead of building a new one for each render.
+
+    Args:
+        template (jinja2.Template): The template.
+        messages (Iterable[Message]): The messages to render.
+
+    Returns:
+        Iterator[str]: The rendered messages, in order.
+    """
+    context = template.new_context({'message': None})
+    # Templates extending another one add the blocks of their parent to the context on each render.
+    blocks = {name: list(block) for name, block in context.blocks.items()}
+    render = template.root_render_func
+    concat = template.environment.concat
+    for message in messages:
+        context.parent['message'] = message
+        context.vars.clear()
+        context.exported_vars.clear()
+        if blocks:
+            context.blocks = {name: list(block) for name, block in blocks.items()}
+        try:
+            yield concat(render(context))
+        except Exception:
+            template.environment.handle_exception()
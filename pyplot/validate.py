@@ -0,0 +1,249 @@
+# This file contains the validation mode, checking plot files without building their messages and collecting every error.
+
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, TextIO
+import itertools
+from .pyplot import PlotError, PlotParser, REGEX_ACTORS, continuation_data, decode_json_data, is_arrow_line, json_span
+from .batch import find_plots
+
+@dataclass
+class Diagnostic:
+    """
+    Represents an error found in a plot file.
+
+    Attributes:
+        line (int): The line number of the error, 0 if the file could not be read.
+        message (str): The description of the error.
+        char_number (int, optional): The position of the error in `text`, or None if unknown.
+        text (str, optional): The text holding the error: the line, or the JSON data of the message.
+    """
+
+    line: int
+    message: str
+    char_number: int = None
+    text: str = None
+
+    def to_dict(self) -> dict:
+        return {'line': self.line, 'char': self.char_number, 'message': self.message, 'text': self.text}
+
+@dataclass
+class ValidationResult:
+    """
+    Represents the result of validating a plot file.
+
+    Attributes:
+        path (str): The path of the plot file.
+        messages (int): The number of messages found.
+        diagnostics (list[Diagnostic]): The errors, by line.
+        truncated (bool): True if the validation stopped after `max_errors` errors.
+    """
+
+    path: str
+    messages: int = 0
+    diagnostics: list[Diagnostic] = field(default_factory=list)
+    truncated: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.diagnostics
+
+    def to_dict(self) -> dict:
+        return {
+            'path': self.path,
+            'ok': self.ok,
+            'messages': self.messages,
+            'truncated': self.truncated,
+            'errors': [diagnostic.to_dict() for diagnostic in self.diagnostics],
+        }
+
+    def lines(self) -> Iterator[str]:
+        """
+        Formats the errors as `path:line: message`, the format editors and pre-commit hooks understand.
+
+        Returns:
+            Iterator[str]: One line per error.
+        """
+        for diagnostic in self.diagnostics:
+            message = ' '.join(diagnostic.message.split())
+            yield f"{self.path}:{diagnostic.line}: {message}"
+
+class PlotValidator(PlotParser):
+    """
+    A parser checking a plot without building its messages.
+    Lines are checked as `PlotParser` parses them, so the same errors are found, but an error does not stop the validation.
+    The line holding an error is skipped, and the following lines are checked as if it was not there:
+    the pending message stays open, and the continuation lines after the error are still added to it.
+
+    Attributes:
+        actors (list[str]): The names of the actors. No plot is built.
+        max_errors (int, optional): The number of errors after which the validation stops, or None to find them all.
+        result (ValidationResult): The result of the validation.
+
+    Methods:
+        validate(self) -> ValidationResult: Checks every line of the source.
+        check_line(self, line: str, line_no: int) -> str | None: Checks a line, returning the content of the message it opens.
+        check_pending(self): Checks the JSON data of the pending message.
+    """
+
+    def __init__(self, source: str | TextIO | Iterable[str], max_errors: int = None):
+        """
+        Initializes the PlotValidator object.
+
+        Args:
+            source (str | TextIO | Iterable[str]): The path of the file to be checked, an open file or an iterable of lines.
+            max_errors (int, optional): The number of errors after which the validation stops. Defaults to None, all errors are found.
+        """
+        super().__init__(source, None)
+        self.actors = []
+        self.max_errors = max_errors
+        self.result = ValidationResult(self.filename)
+        self.pending_line_no = None
+
+    def validate(self) -> ValidationResult:
+        """
+        Checks every line of the source, or until `max_errors` errors are found.
+
+        Returns:
+            ValidationResult: The result of the validation.
+        """
+        try:
+            lines = self.read_lines()
+            header = next(lines, '')
+            self.actors = REGEX_ACTORS.findall(header)
+            nb_actors = len(self.actors)
+            for line_no, line in enumerate(lines, 2):
+                if self.pending_lines is not None and not is_arrow_line(line):
+                    data = continuation_data(line, nb_actors)
+                    if data is not None:
+                        self.pending_lines.append(data)
+                    continue
+                try:
+                    content = self.check_line(line, line_no)
+                except PlotError as e:
+                    self.add(line_no, e.message, e.char_number, e.line)
+                    content = None
+                except Exception:
+                    self.add(line_no, 'invalid syntax', None, line)
+                    content = None
+                if content is not None:
+                    self.check_pending()
+                    self.pending_lines = [content]
+                    self.pending_line_no = line_no
+                    self.result.messages += 1
+                if self.result.truncated:
+                    break
+            else:
+                self.check_pending()
+        except (OSError, UnicodeDecodeError) as e:
+            self.add(0, f"cannot read the file: {e}")
+        # The JSON data of a message is checked when the message closes, after the lines following it.
+        self.result.diagnostics.sort(key=lambda diagnostic: diagnostic.line)
+        return self.result
+
+    def check_line(self, line: str, line_no: int) -> str | None:
+        """
+        Checks a line that is not the continuation of a message.
+
+        Args:
+            line (str): The line to be checked.
+            line_no (int): The line number.
+
+        Raises:
+            PlotError: If the line is invalid.
+            IndexError: If the columns of the message do not match the actors.
+
+        Returns:
+            str | None: The content of the message opened by this line, if any.
+        """
+        nb_columns_befor_message, nb_columns_after_message, message_found, arrow_ended, message_direction, end_of_columns = self.get_column_counts(line)
+        if not message_found:
+            return None
+        data = self.extract_data(line, end_of_columns, nb_columns_after_message)
+        if not data:
+            raise PlotError("no message content. If you want no operation, use `#` to indicate it wasn't a mistake.", char_number=end_of_columns, line=line)
+        # The actors are looked up as `get_sender_receiver_direction` does, so the same columns are out of range.
+        self.actors[nb_columns_befor_message]
+        self.actors[len(self.actors) - nb_columns_after_message]
+        return data
+
+    def check_pending(self):
+        """
+        Checks the JSON data of the pending message, if any, and closes it.
+        """
+        if self.pending_lines is None:
+            return
+        content = '\n'.join(self.pending_lines)
+        self.pending_lines = None
+        if '{' not in content:
+            return
+        try:
+            json_start, json_end = json_span(content)
+            decode_json_data(content[json_start:json_end], self.pending_line_no, json_start)
+        except PlotError as e:
+            self.add(self.pending_line_no, e.message, e.char_number, e.line)
+
+    def add(self, line_no: int, message: str, char_number: int = None, text: str = None):
+        if self.result.truncated:
+            return
+        self.result.diagnostics.append(Diagnostic(line_no, message, char_number, text))
+        if self.max_errors is not None and len(self.result.diagnostics) >= self.max_errors:
+            self.result.truncated = True
+
+def validate_file(path: str | TextIO | Iterable[str], max_errors: int = None) -> ValidationResult:
+    """
+    Checks a plot file without building its messages, collecting every error instead of stopping at the first one.
+
+    Args:
+        path (str | TextIO | Iterable[str]): The path of the plot file, or an open file / iterable of lines.
+        max_errors (int, optional): The number of errors after which the validation of the file stops. Defaults to None.
+
+    Returns:
+        ValidationResult: The result of the validation.
+    """
+    return PlotValidator(path, max_errors).validate()
+
+def validate_many(paths: Iterable[str], workers: int = None, max_errors: int = None, chunksize: int = 16) -> Iterator[ValidationResult]:
+    """
+    Checks many plot files across a pool of processes.
+    Validating needs no action nor template, so files are sent to the workers by chunks.
+
+    Args:
+        paths (Iterable[str]): The plot files to check. Directories are searched for `.plot` files.
+        workers (int, optional): The number of processes. Defaults to the number of CPUs. With 1, files are checked in this process.
+        max_errors (int, optional): The number of errors after which the validation of a file stops. Defaults to None.
+        chunksize (int, optional): The number of files sent to a worker at once. Defaults to 16.
+
+    Returns:
+        Iterator[ValidationResult]: The results, in the order of the files.
+    """
+    paths = find_plots(paths)
+    if workers == 1:
+        for path in paths:
+            yield validate_file(path, max_errors)
+        return
+    # Importing the process pool is slow, validations in this process do not need it.
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(validate_file, paths, itertools.repeat(max_errors), chunksize=chunksize)
+
+def validation_report(results: Iterable[ValidationResult], only_invalid: bool = True) -> dict:
+    """
+    Summarizes validation results as a JSON-serializable report.
+
+    Args:
+        results (Iterable[ValidationResult]): The results of the validations.
+        only_invalid (bool, optional): If True, only the invalid files are listed. Defaults to True.
+
+    Returns:
+        dict: The number of files, invalid files and errors, and the listed files with their errors.
+    """
+    report = {'files': 0, 'invalid': 0, 'errors': 0, 'messages': 0, 'results': []}
+    for result in results:
+        report['files'] += 1
+        report['messages'] += result.messages
+        report['errors'] += len(result.diagnostics)
+        if not result.ok:
+            report['invalid'] += 1
+        if not (result.ok and only_invalid):
+            report['results'].append(result.to_dict())
+    return report
@@ -0,0 +1,65 @@
+# Tests of the incremental mode, comparing updated plots with plots played again from scratch.
+
+import unittest
+from pyplot import ActionRegistry, IncrementalPlot
+
+LINES = """\
+Client    Server
+|          |
+|--------->| REQ one
+|<---------| RESP one
+|--------->| REQ two {"id": 2}
+|<---------| RESP two
+|--------->| REQ three
+""".split('\n')
+
+def numbered_registry() -> ActionRegistry:
+    registry = ActionRegistry('incremental-numbered')
+
+    @registry.action
+    class Numbered:
+        def trigger(plot, message):
+            return True
+
+        def execute(plot, message):
+            return f"[{message.order}] line {message.line}: {message.title} {message.content}\n"
+
+    return registry
+
+class IncrementalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = numbered_registry()
+
+    def assertSameAsFullPlay(self, incremental: IncrementalPlot):
+        full = IncrementalPlot('incremental', None, self.registry)
+        full.load(list(incremental.lines))
+        self.assertEqual(incremental.result(), full.result())
+        self.assertEqual([(message.order, message.line) for message in incremental.plot.messages],
+                         [(message.order, message.line) for message in full.plot.messages])
+
+    def load(self) -> IncrementalPlot:
+        incremental = IncrementalPlot('incremental', None, self.registry)
+        incremental.load(list(LINES))
+        return incremental
+
+    def test_insertion(self):
+        incremental = self.load()
+        changed = incremental.update(3, 3, ['|--------->| REQ inserted'])
+        self.assertSameAsFullPlay(incremental)
+        self.assertEqual(changed, [1, 2, 3, 4, 5])
+
+    def test_deletion(self):
+        incremental = self.load()
+        changed = incremental.update(2, 4, [])
+        self.assertSameAsFullPlay(incremental)
+        self.assertEqual(changed, [0, 1, 2])
+
+    def test_change_in_place(self):
+        incremental = self.load()
+        changed = incremental.update(5, 6, ['|<---------| RESP changed'])
+        self.assertSameAsFullPlay(incremental)
+        self.assertEqual(changed, [3])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+# Tests of the replay driver, against stand-in servers and small scripted servers.
+
+import socketserver
+import threading
+import unittest
+from pyplot import ActionRegistry, Plot, frame_by_delimiter, frame_by_length, frame_http, frame_until_idle, replay, stand_in_servers
+
+CONVERSATION = """\
+Client    Server
+|          |
+|--------->| REQ one
+|<---------| RESP one
+|--------->| REQ two
+|<---------| RESP two
+"""
+
+SERVER_ONLY_SENDS = """\
+Client    Server
+|          |
+|<---------| PUSH one
+|<---------| PUSH two
+"""
+
+HTTP_CONVERSATION = """\
+Client    Server
+|          |
+|--------->| GET
+|<---------| OK
+"""
+
+HTTP_REQUEST = "GET / HTTP/1.1\r\nHost: server\r\n\r\n"
+HTTP_RESPONSE = "HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nhello"
+HTTP_CHUNKED_RESPONSE = "HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n2\r\nhe\r\n3\r\nllo\r\n0\r\n\r\n"
+
+def line_registry() -> ActionRegistry:
+    registry = ActionRegistry('replay-lines')
+
+    @registry.action
+    class Line:
+        def trigger(plot, message):
+            return True
+
+        def execute(plot, message):
+            return f"{message.title} {message.content}\n"
+
+    return registry
+
+def http_registry(response: str) -> ActionRegistry:
+    registry = ActionRegistry('replay-http')
+
+    @registry.action
+    class Http:
+        def trigger(plot, message):
+            return True
+
+        def execute(plot, message):
+            return HTTP_REQUEST if message.title == 'GET' else response
+
+    return registry
+
+def parse(text: str) -> Plot:
+    plot = Plot('replay', text.splitlines())
+    plot.parse()
+    return plot
+
+class ScriptedServer:
+    """
+    A server answering each line it receives with the result of `answer`, counting its connections.
+    """
+
+    def __init__(self, answer, delimiter: bytes = b'\n'):
+        server = self
+        self.connections = 0
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                server.connections += 1
+                request = b''
+                while True:
+                    chunk = self.request.recv(4096)
+                    if not chunk:
+                        return
+                    request += chunk
+                    while delimiter in request:
+                        line, _, request = request.partition(delimiter)
+                        self.request.sendall(answer(line))
+
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def bind(self, plot: Plot, actor: str):
+        host, port = self.server.server_address[:2]
+        plot.set_actor_data({'host': host, 'port': port}, actor)
+
+class ReplayTest(unittest.TestCase):
+
+    def test_replay_against_stand_in_servers(self):
+        registry = line_registry()
+        plot = parse(CONVERSATION)
+        servers = stand_in_servers(plot, 'Client', registry)
+        with servers['Server']:
+            report = replay(plot, 'Client', iterations=5, concurrency=2, timeout=2, registry=registry, framing=frame_by_length)
+        self.assertEqual((report.requests, report.responses, report.mismatches, report.errors), (10, 10, 0, 0), report.failures)
+        self.assertEqual(len(report.latencies), 10)
+        self.assertEqual(servers['Server'].mismatches, 0)
+
+    def test_unparsed_plot(self):
+        registry = line_registry()
+        plot = Plot('replay', CONVERSATION.splitlines())
+        servers = stand_in_servers(plot, 'Client', registry)
+        with servers['Server']:
+            report = replay(plot, 'Client', iterations=2, timeout=2, registry=registry, framing=frame_by_length)
+        self.assertEqual((report.responses, report.mismatches, report.errors), (4, 0, 0), report.failures)
+
+    def test_stand_in_server_sending_only(self):
+        registry = line_registry()
+        plot = parse(SERVER_ONLY_SENDS)
+        servers = stand_in_servers(plot, 'Client', registry)
+        with servers['Server']:
+            report = replay(plot, 'Client', iterations=3, timeout=2, registry=registry, framing=frame_by_length)
+        self.assertEqual((report.responses, report.mismatches, report.errors), (6, 0, 0), report.failures)
+
+    def test_longer_response_does_not_shift_the_next_ones(self):
+        answers = {b'REQ one': b'RESP one, and more\n', b'REQ two': b'RESP two\n'}
+        plot = parse(CONVERSATION)
+        with ScriptedServer(answers.get) as server:
+            server.bind(plot, 'Server')
+            report = replay(plot, 'Client', iterations=3, timeout=2, registry=line_registry(), framing=frame_by_delimiter(b'\n'))
+        self.assertEqual((report.responses, report.mismatches, report.errors), (6, 3, 0), report.failures)
+        self.assertIn(b'RESP one, and more', report.failures[0].encode())
+        # A connection with a mismatch is closed, not reused.
+        self.assertEqual(server.connections, 3)
+
+    def test_shorter_response_with_idle_framing(self):
+        answers = {b'REQ one': b'RESP\n', b'REQ two': b'RESP two\n'}
+        plot = parse(CONVERSATION)
+        with ScriptedServer(answers.get) as server:
+            server.bind(plot, 'Server')
+            report = replay(plot, 'Client', iterations=2, timeout=2, registry=line_registry(), framing=frame_until_idle(0.02))
+        self.assertEqual((report.responses, report.mismatches, report.errors), (4, 2, 0), report.failures)
+
+    def test_http_framing(self):
+        for response in (HTTP_RESPONSE, HTTP_CHUNKED_RESPONSE):
+            plot = parse(HTTP_CONVERSATION)
+            with ScriptedServer(lambda request: response.encode(), delimiter=b'\r\n\r\n') as server:
+                server.bind(plot, 'Server')
+                report = replay(plot, 'Client', iterations=3, timeout=2, registry=http_registry(response), framing=frame_http)
+            self.assertEqual((report.responses, report.mismatches, report.errors), (3, 0, 0), report.failures)
+            self.assertEqual(server.connections, 1)
+
+if __name__ == '__main__':
+    unittest.main()